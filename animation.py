@@ -0,0 +1,136 @@
+import math
+
+# a frame that stalled (loading a scene, dragging the window) shouldn't skip an animation
+MAX_STEP = 0.1
+
+def linear(t):
+    return t
+
+def ease_in_quad(t):
+    return t * t
+
+def ease_out_quad(t):
+    return 1 - (1 - t) * (1 - t)
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+def ease_in_out_sine(t):
+    return -(math.cos(math.pi * t) - 1) / 2
+
+EASINGS = {
+    "linear": linear,
+    "ease_in_quad": ease_in_quad,
+    "ease_out_quad": ease_out_quad,
+    "ease_in_out_quad": ease_in_out_quad,
+    "ease_out_cubic": ease_out_cubic,
+    "ease_in_out_sine": ease_in_out_sine,
+}
+
+class Tween:
+    # moves one attribute of target to end over duration seconds, attr can be a path like "rect.x"
+    def __init__(self, target, attr, end, duration, ease=linear, delay=0, start=None, on_done=None):
+        *path, self.attr = attr.split(".")
+        for name in path:
+            target = getattr(target, name)
+        self.target = target
+        self.end = end
+        self.duration = duration
+        self.ease = EASINGS[ease] if isinstance(ease, str) else ease
+        self.delay = delay
+        self.start = start
+        self.on_done = on_done
+        self.elapsed = 0
+        self.done = False
+
+    def update(self, dt):
+        self.elapsed += dt
+        if self.elapsed < self.delay:
+            return False
+        if self.start is None:
+            # read when it starts, so a tween can pick up where an earlier one finished
+            self.start = getattr(self.target, self.attr)
+        t = min(1, (self.elapsed - self.delay) / self.duration) if self.duration else 1
+        self.set(self.start + (self.end - self.start) * self.ease(t))
+        if t == 1:
+            self.finish()
+        return self.done
+
+    def set(self, value):
+        # ints stay ints, rects and alphas don't take floats
+        if isinstance(self.end, int):
+            value = round(value)
+        setattr(self.target, self.attr, value)
+
+    def finish(self):
+        if self.done:
+            return
+        self.set(self.end)
+        self.done = True
+        if self.on_done:
+            self.on_done()
+
+class Timer:
+    # calls callback once delay seconds have passed
+    def __init__(self, delay, callback, args=()):
+        self.target = None
+        self.delay = delay
+        self.callback = callback
+        self.args = args
+        self.elapsed = 0
+        self.done = False
+
+    def update(self, dt):
+        self.elapsed += dt
+        if self.elapsed >= self.delay:
+            self.finish()
+        return self.done
+
+    def finish(self):
+        if not self.done:
+            self.done = True
+            self.callback(*self.args)
+
+class Animator:
+    # every scene has one, the main loop advances it with the time since the last frame
+    def __init__(self):
+        self.tweens = []
+
+    def tween(self, target, attr, end, duration, ease=linear, delay=0, start=None, on_done=None):
+        tween = Tween(target, attr, end, duration, ease, delay, start, on_done)
+        self.tweens.append(tween)
+        return tween
+
+    def after(self, delay, callback, *args):
+        timer = Timer(delay, callback, args)
+        self.tweens.append(timer)
+        return timer
+
+    def move(self, widget, x, y, duration, ease=ease_out_cubic, delay=0, on_done=None):
+        self.tween(widget, "rect.x", x, duration, ease, delay)
+        return self.tween(widget, "rect.y", y, duration, ease, delay, on_done=on_done)
+
+    def fade(self, widget, end, duration, ease=linear, delay=0, start=None, on_done=None):
+        return self.tween(widget, "alpha", end, duration, ease, delay, start, on_done)
+
+    def update(self, dt):
+        dt = min(dt, MAX_STEP)
+        # on_done may start new tweens, they get their first step next frame
+        for tween in list(self.tweens):
+            tween.update(dt)
+        self.tweens = [tween for tween in self.tweens if not tween.done]
+
+    def finish(self):
+        while self.tweens:
+            tweens, self.tweens = self.tweens, []
+            for tween in tweens:
+                tween.finish()
+
+    def cancel(self, target=None):
+        self.tweens = [tween for tween in self.tweens if target is not None and tween.target is not target]
+
+    def is_animating(self):
+        return bool(self.tweens)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import pygame
+import bundle
+from collections import OrderedDict
+
+DEFAULT_BUDGET = 64 * 1024 * 1024 # bytes of decoded pixel data
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+def evict(cache, used, budget, size):
+    # drops the least recently used entries of an OrderedDict until used fits in budget,
+    # the newest entry always stays, returns the new used and how many were dropped
+    evicted = 0
+    while used > budget and len(cache) > 1:
+        _, entry = cache.popitem(last=False)
+        used -= size(entry)
+        evicted += 1
+    return used, evicted
+
+class AssetManager:
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.cache = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, path, alpha=True):
+        key = (path, alpha)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            if entry[1] or not pygame.display.get_surface():
+                self.hits += 1
+                return entry[0]
+            # decoded before the display existed, convert it now
+            self._discard(key)
+        else:
+            self.misses += 1
+
+        packed = bundle.load_image(path)
+        image = packed if packed is not None else pygame.image.load(path)
+        surface, converted = self._convert(image, alpha, packed is not None)
+        self.cache[key] = (surface, converted, surface_bytes(surface))
+        self.used += self.cache[key][2]
+        self._evict()
+        return surface
+
+    def preload(self, paths, alpha=True):
+        for path in paths:
+            self.load(path, alpha)
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+    def clear(self):
+        self.cache.clear()
+        self.used = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.cache),
+            "used": self.used,
+            "budget": self.budget
+        }
+
+    def _convert(self, surface, alpha, packed=False):
+        display = pygame.display.get_surface()
+        if not display:
+            return surface, False
+        # packed pixels already match a 32 bit display, so they are used straight from the bundle
+        if packed and alpha and surface.get_masks()[:3] == display.get_masks()[:3]:
+            return surface, True
+        return (surface.convert_alpha() if alpha else surface.convert()), True
+
+    def _discard(self, key):
+        _, _, size = self.cache.pop(key)
+        self.used -= size
+
+    def _evict(self):
+        self.used, evicted = evict(self.cache, self.used, self.budget, lambda entry: entry[2])
+        self.evictions += evicted
+
+manager = AssetManager()
+
+def load(path, alpha=True):
+    return manager.load(path, alpha)
\ No newline at end of file
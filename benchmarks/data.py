@@ -0,0 +1,17 @@
+import json
+import catalog
+
+GENRES = ["Afrobeats", "Pop", "RNB", "Rap"]
+
+def make_songs(count, artists=5000):
+    return [
+        catalog.Song(f"Song {i}", f"Artist {i % artists}", GENRES[i % len(GENRES)], 120 + i * 7919 % 240)
+        for i in range(count)
+    ]
+
+def make_catalog(count, artists=5000):
+    return catalog.SongCatalog(songs=make_songs(count, artists))
+
+def make_json(count, artists=5000):
+    # the same songs, laid out the way song_list.json stores them
+    return json.dumps([song.to_dict() for song in make_songs(count, artists)])
\ No newline at end of file
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = os.path.join(BASE_PATH, "benchmarks/results")
+SIZES = [1_000, 100_000, 1_000_000]
+PHASES = ["process_input", "update", "render"]
+USERNAME = "bench"
+PASSWORD = "bench"
+
+def move(x, y):
+    return [pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0), buttons=(0, 0, 0))]
+
+def click(x, y):
+    return move(x, y) + [
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1),
+        pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(x, y), button=1),
+    ]
+
+def wheel(x, y, steps):
+    return move(x, y) + [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=steps, flipped=False)]
+
+def key(key, unicode=""):
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0)]
+
+def type_text(text):
+    return [key(ord(char), char)[0] for char in text]
+
+def backspace(count):
+    return key(pygame.K_BACKSPACE) * count
+
+# each script is a list of frames, each frame is the events delivered that frame
+def main_menu_script():
+    frames = [[] for _ in range(30)]
+    frames += [click(1260, 355), type_text(USERNAME), click(1260, 415), type_text(PASSWORD), click(1260, 575)]
+    return frames
+
+def library_script():
+    frames = [wheel(500, 600, -1) for _ in range(20)]
+    frames += [wheel(500, 600, 1) for _ in range(20)]
+    frames += [click(400, 45)] + [type_text(char) for char in "song 12"] + [backspace(1) for _ in range(7)]
+    frames += [click(270, 380), click(270, 380), click(500, 380), click(950, 380)]
+    frames += [[] for _ in range(10)]
+    return frames
+
+def playlist_maker_script():
+    frames = [wheel(500, 600, -1) for _ in range(20)]
+    frames += [click(500, 565), [], click(500, 275), []]
+    frames += [click(1140, 335), click(1250, 625), [], click(1140, 335), click(1250, 625)]
+    frames += [[] for _ in range(10)]
+    return frames
+
+def playlist_viewer_script():
+    frames = [[] for _ in range(5)]
+    for _ in range(5):
+        frames += [click(400, 200), [], [], click(1220, 175), []]
+    return frames
+
+def settings_script():
+    frames = [click(930, 255)] + [type_text(char) for char in "Artist 1"] + [backspace(1) for _ in range(8)]
+    frames += [[] for _ in range(10)]
+    return frames
+
+def admin_panel_script():
+    return [[] for _ in range(30)] + [move(700, 400), move(700, 620), move(10, 10)]
+
+SCRIPTS = {
+    "main_menu": main_menu_script,
+    "library": library_script,
+    "playlist_maker": playlist_maker_script,
+    "playlist_viewer": playlist_viewer_script,
+    "settings": settings_script,
+    "admin_panel": admin_panel_script,
+}
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))]
+
+def summarise(samples):
+    return {
+        "frames": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1e3,
+        "p50_ms": percentile(samples, 50) * 1e3,
+        "p95_ms": percentile(samples, 95) * 1e3,
+        "p99_ms": percentile(samples, 99) * 1e3,
+        "max_ms": max(samples) * 1e3,
+    }
+
+def setup(songs, data_dir):
+    import storage
+    import catalog
+    from benchmarks.data import make_catalog
+
+    # scratch users and playlists, the real assets are never written
+    users = os.path.join(data_dir, "users.json")
+    playlists = os.path.join(data_dir, "playlists.json")
+    for path in (users, playlists):
+        with open(path, "w") as f:
+            json.dump({}, f)
+    storage.set_storage(storage.JSONStorage(users, playlists))
+    catalog.set_catalog(make_catalog(songs))
+
+    users = storage.get_storage()
+    users.add_user(USERNAME, {
+        "username": USERNAME,
+        "password": PASSWORD,
+        "full_name": ["Bench", "User"],
+        "dob": "01/01/2000",
+        "favourite_artist": "Artist 1",
+        "favourite_genre": "Pop",
+    })
+    songs = catalog.get_catalog()
+    for i in range(12):
+        users.save_playlist(USERNAME, f"Bench Playlist #{i+1}", songs.songs[i*10:(i+1)*10], os.path.join(BASE_PATH, "assets/images/default.png"))
+
+def run(songs, repeat, dirty_rects):
+    pygame.init()
+    screen = pygame.display.set_mode((1400, 900))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        setup(songs, data_dir)
+        import scenes
+        import ui
+        scenes.Scene.dirty_rects = dirty_rects
+        startup = time.perf_counter() - start
+        scene = scenes.get_scene("main_menu")
+        scene.process_input([])
+        scene.update()
+        scene.render(screen)
+        pygame.display.update()
+        first_frame = time.perf_counter() - start
+
+        results = {}
+        for name, script in SCRIPTS.items():
+            scene = scenes.get_scene(name)
+            scene.invalidate()
+            timings = {phase: [] for phase in PHASES}
+            frames = script() if name == "main_menu" else script() * repeat
+            for events in frames:
+                # the widgets read the pointer from the snapshot, the same as in main.py
+                start = time.perf_counter()
+                scene.process_input(ui.INPUT.begin_frame(events))
+                timings["process_input"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                scene.animator.update(1 / 60)
+                scene.update()
+                timings["update"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                scene.render(screen)
+                timings["render"].append(time.perf_counter() - start)
+
+                # stay on the scene being measured, logging in has already set the username everywhere
+                if scene.next_scene is not scene:
+                    scene.next_scene = scene
+                    scene.invalidate()
+            results[name] = {phase: summarise(samples) for phase, samples in timings.items()}
+            if name == "main_menu" and scenes.STORE["username"] != USERNAME:
+                raise RuntimeError("scripted login failed")
+
+    return {"startup_s": startup, "first_frame_s": first_frame, "scenes": results}
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_PATH, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report):
+    for songs, result in report["results"].items():
+        print(f"\n{songs} songs (startup {result['startup_s']:.2f}s, first frame {result['first_frame_s']:.2f}s)")
+        print(f"{'scene':16} {'phase':14} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, phases in result["scenes"].items():
+            for phase, stats in phases.items():
+                print(f"{name:16} {phase:14} {stats['p50_ms']:8.3f} {stats['p95_ms']:8.3f} {stats['p99_ms']:8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dirty-rects", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.child, "w") as f:
+            json.dump(run(args.songs[0], args.repeat, args.dirty_rects), f)
+        return
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "dirty_rects": args.dirty_rects,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    for songs in args.songs:
+        # one size per process so catalogs and caches don't leak between runs
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, "result.json")
+            command = [sys.executable, "-m", "benchmarks.frame_times", "--child", path, "--songs", str(songs), "--repeat", str(args.repeat)]
+            if args.dirty_rects:
+                command.append("--dirty-rects")
+            subprocess.check_call(command, cwd=BASE_PATH)
+            with open(path) as f:
+                report["results"][str(songs)] = json.load(f)
+
+    print_report(report)
+    output = args.output or os.path.join(RESULTS, f"frame_times-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nwrote {output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,36 @@
+import sys
+import time
+import argparse
+import generator
+from benchmarks.data import make_catalog
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=1_000_000)
+    parser.add_argument("--playlists", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    songs = make_catalog(args.songs)
+    engine = generator.PlaylistGenerator(songs, seed=args.seed)
+    cases = {
+        "any, 20 min": {"minutes": 20},
+        "genre, 20 min, 6 songs": {"genre": "Pop", "minutes": 20, "count": 6},
+        "artist, 10 min": {"artist": "Artist 42", "minutes": 10},
+        "genre, 10 songs": {"genre": "Rap", "count": 10},
+    }
+    print(f"{args.songs} songs, {args.playlists} playlists per case")
+    for name, constraints in cases.items():
+        # the first call builds the candidate list for these filters
+        start = time.perf_counter()
+        engine.generate(**constraints)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        playlists = engine.generate_many(args.playlists, **constraints)
+        per_playlist = (time.perf_counter() - start) / args.playlists
+        average = sum(sum(song.seconds for song in playlist) for playlist in playlists) / len(playlists)
+        print(f"{name:24} {per_playlist * 1e6:8.1f} us/playlist  first {warm * 1e3:7.1f} ms  avg total {average / 60:5.1f} min")
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
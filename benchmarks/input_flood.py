@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from benchmarks.frame_times import USERNAME, setup, summarise
+
+def flood(count, x, y, dragging=False):
+    # a mouse wiggling back and forth, the way a fast drag fills the queue
+    buttons = (1, 0, 0) if dragging else (0, 0, 0)
+    return [pygame.event.Event(pygame.MOUSEMOTION, pos=(x + i % 7, y + i % 5), rel=(1 if i % 2 else -1, 0), buttons=buttons) for i in range(count)]
+
+def run_scene(scene, screen, frames, events, coalesce):
+    import ui
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        # the input state is always kept up to date, only what the scene is handed differs
+        coalesced = ui.INPUT.begin_frame(events)
+        scene.process_input(coalesced if coalesce else events)
+        scene.update()
+        scene.render(screen)
+        samples.append(time.perf_counter() - start)
+    return summarise(samples)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((1400, 900))
+    with tempfile.TemporaryDirectory() as data_dir:
+        setup(args.songs, data_dir)
+        import scenes
+        scenes.SESSION.login(USERNAME)
+
+        library = scenes.get_scene("library")
+        viewer = scenes.get_scene("playlist_viewer")
+        for scene in (library, viewer):
+            scene.process_input([])
+            scene.update()
+            scene.render(screen)
+        slider = library.song_list.slider_rect
+
+        cases = {
+            "library hover": (library, flood(args.events, 500, 500)),
+            "library slider drag": (library, [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=slider.center, button=1)] + flood(args.events, slider.centerx, slider.centery, True)),
+            "playlist cards hover": (viewer, flood(args.events, 400, 300)),
+        }
+        print(f"{args.events} motion events per frame, {args.frames} frames, ms per frame")
+        print(f"{'case':22} {'mode':22} {'p50':>8} {'p95':>8} {'max':>8}")
+        for name, (scene, events) in cases.items():
+            for mode, frame_events, coalesce in [("1 event", events[:2], True), ("uncoalesced dispatch", events, False), ("coalesced", events, True)]:
+                stats = run_scene(scene, screen, args.frames, frame_events, coalesce)
+                print(f"{name:22} {mode:22} {stats['p50_ms']:8.3f} {stats['p95_ms']:8.3f} {stats['max_ms']:8.3f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import sys
+import gc
+import json
+import argparse
+import tracemalloc
+import catalog
+from benchmarks.data import make_json
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, used
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    text = make_json(args.songs)
+    # both go through json.loads so every string is a fresh object, as with song_list.json
+    dicts, dict_bytes = measure(lambda: json.loads(text))
+    del dicts
+    songs, song_bytes = measure(lambda: catalog.to_songs(json.loads(text)))
+    del songs, text
+    dict_per_song = dict_bytes / args.songs
+    song_per_song = song_bytes / args.songs
+
+    print(f"{args.songs} songs")
+    print(f"dict:  {dict_bytes / 2**20:8.1f} MiB  {dict_per_song:6.1f} B/song")
+    print(f"Song:  {song_bytes / 2**20:8.1f} MiB  {song_per_song:6.1f} B/song")
+    print(f"saved: {1 - song_bytes / dict_bytes:.0%}")
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import io
+import json
+import mmap
+import struct
+import hashlib
+import pygame
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+BUNDLE = os.path.join(BASE_PATH, "assets/assets.bundle")
+SOURCES = {
+    "assets/backgrounds": ".png",
+    "assets/images": ".png",
+    "assets/particles": ".png",
+    "assets/fonts": ".ttf",
+}
+MAGIC = b"OCRTBNDL"
+VERSION = 1
+HEADER = struct.Struct("<8sIQ") # magic, version, index offset
+ALIGN = 64
+# the same byte order as a 32 bit display surface, so blitting needs no conversion
+PIXEL_FORMAT = "BGRA"
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def find_sources(base_path=BASE_PATH):
+    paths = []
+    for folder, extension in SOURCES.items():
+        folder = os.path.join(base_path, folder)
+        if os.path.isdir(folder):
+            paths.extend(os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith(extension))
+    return paths
+
+def build(path=BUNDLE, base_path=BASE_PATH):
+    index = {}
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        for source in find_sources(base_path):
+            stat = os.stat(source)
+            if source.endswith(".png"):
+                image = pygame.image.load(source)
+                data = pygame.image.tobytes(image, PIXEL_FORMAT)
+                entry = {"kind": "image", "size": image.get_size()}
+            else:
+                with open(source, "rb") as blob:
+                    data = blob.read()
+                entry = {"kind": "blob"}
+
+            f.write(b"\0" * (-f.tell() % ALIGN))
+            entry.update({
+                "offset": f.tell(),
+                "length": len(data),
+                "mtime": stat.st_mtime_ns,
+                "bytes": stat.st_size,
+                "hash": file_hash(source)
+            })
+            f.write(data)
+            index[os.path.relpath(source, base_path).replace(os.sep, "/")] = entry
+
+        index_offset = f.tell()
+        f.write(json.dumps(index).encode())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, index_offset))
+    return index
+
+class Bundle:
+    def __init__(self, path=BUNDLE, base_path=BASE_PATH):
+        self.base_path = base_path
+        with open(path, "rb") as f:
+            # copy-on-write, so a surface drawn on never touches the file
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_offset = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset bundle")
+        self.index = json.loads(self.data[index_offset:])
+        self.checked = {}
+
+    def get_entry(self, path, kind):
+        key = os.path.relpath(os.path.abspath(path), self.base_path).replace(os.sep, "/")
+        entry = self.index.get(key)
+        if entry is None or entry["kind"] != kind:
+            return None
+        if key not in self.checked:
+            self.checked[key] = self._is_fresh(path, entry)
+        return entry if self.checked[key] else None
+
+    def _is_fresh(self, path, entry):
+        # a bundle shipped without the loose files is trusted as it is
+        if not os.path.exists(path):
+            return True
+        stat = os.stat(path)
+        if stat.st_size != entry["bytes"]:
+            return False
+        return stat.st_mtime_ns == entry["mtime"] or file_hash(path) == entry["hash"]
+
+    def view(self, entry):
+        return memoryview(self.data)[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def load_image(self, path):
+        entry = self.get_entry(path, "image")
+        if entry is None:
+            return None
+        # shares the mapped pages, nothing is decoded or copied
+        return pygame.image.frombuffer(self.view(entry), tuple(entry["size"]), PIXEL_FORMAT)
+
+    def open_blob(self, path):
+        entry = self.get_entry(path, "blob")
+        if entry is None:
+            return None
+        return io.BytesIO(self.view(entry))
+
+_bundle = None
+
+def get_bundle():
+    global _bundle
+    if _bundle is None:
+        try:
+            _bundle = Bundle()
+        except (OSError, ValueError):
+            _bundle = False
+    return _bundle or None
+
+def load_image(path):
+    bundle = get_bundle()
+    return bundle.load_image(path) if bundle else None
+
+def open_blob(path):
+    bundle = get_bundle()
+    return bundle.open_blob(path) if bundle else None
+
+if __name__ == "__main__":
+    index = build()
+    print(f"Packed {len(index)} assets into {BUNDLE} ({os.path.getsize(BUNDLE) / 2**20:.1f} MiB)")
\ No newline at end of file
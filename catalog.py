@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+from bisect import bisect_left, bisect_right
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+SONGS = os.path.join(BASE_PATH, "assets/song_list.json")
+
+# column -> fields compared in order, later fields break ties
+SORT_KEYS = {
+    "name": ("name", "artist", "genre", "seconds"),
+    "artist": ("artist", "name", "genre", "seconds"),
+    "genre": ("genre", "artist", "name", "seconds"),
+    "length": ("seconds", "name", "artist", "genre"),
+}
+
+def song_key(song):
+    return (song.name, song.artist)
+
+def parse_length(length):
+    minutes, seconds = length.split(":")
+    return int(minutes) * 60 + int(seconds)
+
+class Song:
+    # no per-instance dict, artists and genres repeat a lot so they are interned
+    __slots__ = ("name", "artist", "genre", "seconds")
+
+    def __init__(self, name, artist, genre, seconds):
+        self.name = name
+        self.artist = sys.intern(artist)
+        self.genre = sys.intern(genre)
+        self.seconds = seconds
+
+    @classmethod
+    def from_dict(cls, song):
+        return cls(song["name"], song["artist"], song["genre"], parse_length(song["length"]))
+
+    def to_dict(self):
+        return {"name": self.name, "artist": self.artist, "genre": self.genre, "length": self.length}
+
+    @property
+    def length(self):
+        return f"{self.seconds // 60}:{self.seconds % 60:02d}"
+
+    @property
+    def minutes(self):
+        return self.seconds / 60
+
+    def __repr__(self):
+        return f"Song({self.name!r}, {self.artist!r}, {self.genre!r}, {self.seconds})"
+
+def to_songs(songs):
+    return [song if isinstance(song, Song) else Song.from_dict(song) for song in songs]
+
+def collation_key(song, fields):
+    values = (getattr(song, field) for field in fields)
+    return tuple(value.casefold() if isinstance(value, str) else value for value in values)
+
+class SongView:
+    # a sorted window onto the catalog, flipping the direction doesn't touch the order
+    def __init__(self, songs, order, reverse=False):
+        self.songs = songs
+        self.order = order
+        self.reverse = reverse
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self.order)
+        # a reversed out of range index would otherwise wrap round to a real song
+        if not 0 <= index < len(self.order):
+            raise IndexError("song index out of range")
+        if self.reverse:
+            index = len(self.order) - 1 - index
+        return self.songs[self.order[index]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def reversed(self):
+        return SongView(self.songs, self.order, not self.reverse)
+
+class SongSubset:
+    # the songs at ids, less the excluded ones, each row is only worked out when it is read
+    def __init__(self, songs, ids, excluded=()):
+        self.songs = songs
+        self.ids = ids
+        # positions in ids that get skipped, in order
+        positions = ((bisect_left(ids, song_id), song_id) for song_id in set(excluded))
+        self.skipped = sorted(i for i, song_id in positions if i < len(ids) and ids[i] == song_id)
+
+    def __len__(self):
+        return len(self.ids) - len(self.skipped)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("song index out of range")
+        # every skipped position at or before the row pushes it one further along
+        for position in self.skipped:
+            if position > index:
+                break
+            index += 1
+        return self.songs[self.ids[index]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+class SongCatalog:
+    def __init__(self, songs=None, path=SONGS):
+        self.path = path
+        self.version = 0
+        self.orders = {}
+        self.orders_version = None
+        if songs is None:
+            self.load()
+        else:
+            self.set_songs(songs)
+
+    def load(self):
+        with open(self.path, "r") as f:
+            self.set_songs(json.load(f))
+
+    def set_songs(self, songs):
+        # a song's id is its position in the catalog and never changes while loaded
+        self.songs = to_songs(songs)
+        self.ids = {}
+        self.artists = {}
+        self.genres = {}
+        self.durations = []
+        for song in self.songs:
+            self._index(song)
+        self._sort_durations()
+        self.version += 1
+
+    def add(self, song):
+        song = to_songs([song])[0]
+        song_id = self._index(song)
+        self.songs.append(song)
+        self._sort_durations()
+        self.version += 1
+        return song_id
+
+    def get(self, song_id):
+        return self.songs[song_id]
+
+    def get_id(self, song):
+        return self.ids.get(id(song))
+
+    def find_ids(self, song):
+        # every song with the same name and artist, for records that didn't come from this catalog
+        key = song_key(song)
+        return [i for i in self.artists.get(song.artist.lower(), []) if song_key(self.songs[i]) == key]
+
+    def duration(self, song_id):
+        return self.durations[song_id]
+
+    def by_artist(self, artist):
+        return [self.songs[i] for i in self.artists.get(artist.lower(), [])]
+
+    def by_genre(self, genre):
+        return [self.songs[i] for i in self.genres.get(genre, [])]
+
+    def by_duration(self, min_seconds=0, max_seconds=float("inf")):
+        start = bisect_left(self.sorted_durations, min_seconds)
+        end = bisect_right(self.sorted_durations, max_seconds)
+        return [self.songs[i] for i in sorted(self.duration_order[start:end])]
+
+    def sort_order(self, column):
+        # one permutation per column and catalog version, shared by both directions
+        if self.orders_version != self.version:
+            self.orders = {}
+            self.orders_version = self.version
+        if column not in self.orders:
+            fields = SORT_KEYS[column]
+            keys = [collation_key(song, fields) for song in self.songs]
+            self.orders[column] = sorted(range(len(keys)), key=keys.__getitem__)
+        return self.orders[column]
+
+    def sorted_view(self, column, reverse=False):
+        return SongView(self.songs, self.sort_order(column), reverse)
+
+    def query(self, artist=None, genres=None):
+        if artist is None and not genres:
+            return list(self.songs)
+        return [self.songs[i] for i in self.query_ids(artist, genres)]
+
+    def query_ids(self, artist=None, genres=None):
+        if artist is None and not genres:
+            return range(len(self.songs))
+        ids = None
+        if artist is not None:
+            ids = set(self.artists.get(artist.lower(), []))
+        if genres:
+            genre_ids = set()
+            for genre in genres:
+                genre_ids.update(self.genres.get(genre, []))
+            ids = genre_ids if ids is None else ids & genre_ids
+        # keep catalog order
+        return sorted(ids)
+
+    def _index(self, song):
+        song_id = len(self.ids)
+        self.ids[id(song)] = song_id
+        self.artists.setdefault(song.artist.lower(), []).append(song_id)
+        self.genres.setdefault(song.genre, []).append(song_id)
+        self.durations.append(song.seconds)
+        return song_id
+
+    def _sort_durations(self):
+        self.duration_order = sorted(range(len(self.durations)), key=self.durations.__getitem__)
+        self.sorted_durations = [self.durations[i] for i in self.duration_order]
+
+_catalog = None
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = SongCatalog()
+    return _catalog
+
+def set_catalog(catalog):
+    global _catalog
+    _catalog = catalog
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import pygame
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import asset_manager
+
+COVER_SIZE = (150, 150)
+DEFAULT_BUDGET = 32 * 1024 * 1024 # bytes of cover pixels
+WORKERS = 4
+
+def decode(path, size):
+    # runs on the pool, PIL lets go of the GIL while it decodes and resamples
+    with Image.open(path) as img:
+        img.draft("RGB", size)
+        img.thumbnail(size)
+        img = img.convert("RGBA")
+        return img.tobytes(), img.size
+
+class CoverCache:
+    def __init__(self, budget=DEFAULT_BUDGET, workers=WORKERS):
+        self.budget = budget
+        self.workers = workers
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.failed = set()
+        self.used = 0
+        self.executor = None
+
+    def request(self, path, size=COVER_SIZE):
+        # the key changes when the file does, so an edited cover is never served stale
+        try:
+            key = (path, os.stat(path).st_mtime_ns, tuple(size))
+        except OSError:
+            return None
+        if key not in self.cache and key not in self.pending and key not in self.failed:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            self.pending[key] = self.executor.submit(decode, path, size)
+        return key
+
+    def get(self, key):
+        if key is None:
+            return None
+        if self.pending:
+            self.poll()
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+        elif key not in self.pending and key not in self.failed:
+            # evicted, decode it again
+            self.request(key[0], key[2])
+        return surface
+
+    def poll(self):
+        # surfaces are only made on the main thread
+        for key, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[key]
+            try:
+                data, size = future.result()
+            except Exception:
+                self.failed.add(key)
+                continue
+            surface = pygame.image.frombuffer(data, size, "RGBA")
+            surface = surface.convert_alpha() if pygame.display.get_surface() else surface.copy()
+            self.cache[key] = surface
+            self.used += asset_manager.surface_bytes(surface)
+            self._evict()
+
+    def clear(self):
+        self.cache.clear()
+        self.failed.clear()
+        self.used = 0
+
+    def _evict(self):
+        self.used, _ = asset_manager.evict(self.cache, self.used, self.budget, asset_manager.surface_bytes)
+
+covers = CoverCache()
+
+def request(path, size=COVER_SIZE):
+    return covers.request(path, size)
+
+def get(key):
+    return covers.get(key)
+
+def busy():
+    return bool(covers.pending)
\ No newline at end of file
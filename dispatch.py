@@ -0,0 +1,151 @@
+import bisect
+import pygame
+import ui
+
+CELL_SIZE = 100
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
+
+class SpatialGrid:
+    # widgets bucketed by the cells their bounds cover, so a lookup only looks at one cell
+    def __init__(self, widgets, cell_size=CELL_SIZE):
+        self.widgets = widgets
+        self.cell_size = cell_size
+        self.rebuild()
+
+    def rebuild(self):
+        self.cells = {}
+        self.placed = {}
+        # draw order, later widgets are on top
+        self.order = {widget: z for z, widget in enumerate(self.widgets)}
+        self.snapshot = list(self.widgets)
+        for widget in self.widgets:
+            self.place(widget, self.bounds(widget))
+
+    def bounds(self, widget):
+        # labels and backgrounds never take input, so they can't get in the way of what's under them
+        return tuple(widget.get_bounds()) if widget.interactive else None
+
+    def place(self, widget, bounds):
+        old = self.placed.get(widget)
+        if old is not None:
+            for cell in old[1]:
+                self.cells[cell].remove(widget)
+        cells = self._cells(bounds) if bounds else ()
+        for cell in cells:
+            bisect.insort(self.cells.setdefault(cell, []), widget, key=self.order.__getitem__)
+        self.placed[widget] = (bounds, cells)
+
+    def update(self, widget):
+        bounds = self.bounds(widget)
+        if bounds != self.placed[widget][0]:
+            self.place(widget, bounds)
+
+    def refresh(self):
+        if self.widgets != self.snapshot:
+            self.rebuild()
+            return
+        # only the widgets that moved or changed size leave their cells
+        placed = self.placed
+        for widget in self.widgets:
+            bounds = tuple(widget.get_bounds()) if widget.interactive else None
+            if bounds != placed[widget][0]:
+                self.place(widget, bounds)
+
+    def query(self, pos):
+        # everything under pos, topmost first
+        bucket = self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ())
+        return [widget for widget in reversed(bucket) if widget.visible and widget.hit_test(pos)]
+
+    def _cells(self, bounds):
+        x, y, width, height = bounds
+        size = self.cell_size
+        return [(cx, cy) for cx in range(x // size, (x + width - 1) // size + 1) for cy in range(y // size, (y + height - 1) // size + 1)]
+
+class Layer:
+    # a modal layer takes every pointer event inside rect, or everywhere when rect is None
+    def __init__(self, widgets, rect=None):
+        self.grid = SpatialGrid(widgets)
+        self.rect = rect
+
+    def covers(self, pos):
+        return self.rect is None or self.rect.collidepoint(pos)
+
+class Dispatcher:
+    # pointer events go to the widget under the pointer, keys to the one that was last clicked
+    def __init__(self, widgets):
+        self.layers = [Layer(widgets)]
+        self.focus = None
+        self.capture = None
+        self.hovered = []
+        self.stale = False
+
+    def invalidate(self):
+        # widgets may have moved or grown, checked before the next event
+        self.stale = True
+
+    def push_layer(self, widgets, rect=None):
+        self.layers.append(Layer(widgets, rect))
+        self.focus = None
+        self.capture = None
+
+    def pop_layer(self):
+        if len(self.layers) > 1:
+            self.layers.pop()
+            self.focus = None
+            self.capture = None
+
+    def hits(self, pos):
+        for layer in reversed(self.layers):
+            if layer is self.layers[0] or layer.covers(pos):
+                return layer.grid.query(pos)
+
+    def target(self, pos):
+        hits = self.hits(pos)
+        return hits[0] if hits else None
+
+    def dispatch(self, event):
+        if self.stale:
+            for layer in self.layers:
+                layer.grid.refresh()
+            self.stale = False
+
+        targets = []
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            target = self.target(event.pos)
+            # the old focus sees the click too, so it can let go of the keyboard
+            if self.focus is not None and self.focus is not target:
+                targets.append(self.focus)
+            self.focus = self.capture = target
+            if target is not None:
+                targets.append(target)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            # whatever was pressed hears about the release, wherever it happens
+            target = self.capture or self.target(event.pos)
+            self.capture = None
+            if target is not None:
+                targets.append(target)
+        elif event.type == pygame.MOUSEMOTION:
+            # hover applies to everything under the pointer, and to whatever it just left
+            hits = self.hits(event.pos)
+            targets = [widget for widget in self.hovered if widget not in hits] + hits
+            if self.capture is not None and self.capture not in targets:
+                targets.append(self.capture)
+            self.hovered = hits
+        elif event.type == pygame.MOUSEWHEEL:
+            target = self.target(ui.INPUT.pos)
+            if target is not None:
+                targets.append(target)
+        elif event.type in KEY_EVENTS:
+            if self.focus is not None:
+                targets.append(self.focus)
+
+        for widget in targets:
+            widget.handle_event(event)
+            # opening a menu grows a widget straight away
+            self.place(widget)
+        return targets
+
+    def place(self, widget):
+        for layer in self.layers:
+            if widget in layer.grid.order:
+                layer.grid.update(widget)
\ No newline at end of file
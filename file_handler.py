@@ -1,31 +1,98 @@
 import os
-import shutil
-import tkinter as tk
-from tkinter import filedialog
+import sys
+import queue
+import hashlib
+import itertools
+import threading
+import subprocess
 from PIL import Image
 
-root = tk.Tk()
-root.withdraw()
+# uncompressed, so pygame loads a cover without inflating anything
+COVER_FORMAT = "TGA"
+COVER_EXTENSION = ".tga"
 
-def handle_image_change(username, base_dir, size):
-    error = None
-    user_dir = os.path.join(base_dir, username)
-    os.makedirs(user_dir, exist_ok=True)
-    file_path = filedialog.askopenfilename(title="Select an image file", 
-                                           filetypes=[("Image files", "*.jpg;*.jpeg;*.png;*.gif")])
+class ImageImporter:
+    # one import at a time, the worker waits on the dialog's process and then decodes off the main thread
+    def __init__(self):
+        self.results = queue.Queue()
+        self.worker = None
+        self.jobs = itertools.count()
+        self.keys = {}
 
-    if file_path:
-        file_name = os.path.basename(file_path)
-        destination_path = os.path.join(user_dir, file_name)
+    def busy(self):
+        return self.worker is not None and self.worker.is_alive()
 
+    def pending(self):
+        # still running, or finished with a result nobody has polled yet
+        return self.busy() or not self.results.empty()
+
+    def start(self, key, base_dir, size):
+        if self.busy():
+            return False
+        job = next(self.jobs)
+        self.keys[job] = key
+        self.worker = threading.Thread(target=self._run, args=(job, base_dir, size), daemon=True)
+        self.worker.start()
+        return True
+
+    def rename(self, old_key, new_key):
+        # a pending import is handed back under whatever its key is called by then
+        for job, key in self.keys.items():
+            if key == old_key:
+                self.keys[job] = new_key
+
+    def poll(self):
+        # called from the main thread every frame, returns (key, path, error) for finished imports
+        results = []
+        while True:
+            try:
+                job, path, error = self.results.get_nowait()
+            except queue.Empty:
+                return results
+            results.append((self.keys.pop(job), path, error))
+
+    def _run(self, job, base_dir, size):
         try:
-            with Image.open(file_path) as img:
-                width, height = img.size
-                if width > size[0] or height > size[1]:
-                    error = f"Image dimensions ({width}x{height}) exceed the allowed size of {size}."
-                else:
-                    shutil.copy(file_path, destination_path)
+            file_path = ask_image()
+            path = import_image(file_path, base_dir, size) if file_path else None
+            self.results.put((job, path, None))
         except Exception as e:
-            error = f"Failed to process the image: {e}"
+            self.results.put((job, None, f"Failed to process the image: {e}"))
+
+def ask_image():
+    # Tk has to run on the main thread of its process, so the dialog gets a process of its own
+    # and pygame keeps drawing while it is open
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--ask-image"], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def _image_dialog():
+    import tkinter as tk
+    from tkinter import filedialog
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        return filedialog.askopenfilename(parent=root, title="Select an image file",
+                                          filetypes=[("Image files", "*.jpg;*.jpeg;*.png;*.gif")])
+    finally:
+        root.destroy()
+
+def import_image(file_path, base_dir, size):
+    with Image.open(file_path) as img:
+        # jpegs decode straight to a smaller scale instead of full size
+        img.draft("RGB", size)
+        img.thumbnail(size)
+        img = img.convert("RGBA")
+
+    # named after the pixels, so importing the same picture twice shares one file
+    digest = hashlib.sha1(img.tobytes())
+    digest.update(repr(img.size).encode())
+    os.makedirs(base_dir, exist_ok=True)
+    path = os.path.join(base_dir, digest.hexdigest() + COVER_EXTENSION)
+    if not os.path.exists(path):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        img.save(temp_path, COVER_FORMAT)
+        os.replace(temp_path, path)
+    return path
 
-    return error if error else destination_path
\ No newline at end of file
+if __name__ == "__main__" and "--ask-image" in sys.argv:
+    print(_image_dialog())
\ No newline at end of file
@@ -0,0 +1,93 @@
+import random
+import catalog
+
+POOL_SIZE = 64
+
+class PlaylistGenerator:
+    def __init__(self, songs=None, seed=None, pool_size=POOL_SIZE):
+        self.catalog = songs
+        self.random = random.Random(seed)
+        self.pool_size = pool_size
+        self.candidates = {}
+        self.version = None
+
+    def get_catalog(self):
+        return self.catalog or catalog.get_catalog()
+
+    def seed(self, seed):
+        self.random.seed(seed)
+
+    def get_candidates(self, artist=None, genre=None):
+        songs = self.get_catalog()
+        if (songs, songs.version) != self.version:
+            self.candidates = {}
+            self.version = (songs, songs.version)
+        key = (artist.lower() if artist else None, genre)
+        if key not in self.candidates:
+            if artist is None and genre is None:
+                ids = range(len(songs.songs))
+            else:
+                ids = songs.query_ids(artist=artist, genres=[genre] if genre else None)
+            self.candidates[key] = ids
+        return self.candidates[key]
+
+    def generate(self, artist=None, genre=None, minutes=None, count=None):
+        songs = self.get_catalog()
+        ids = self.get_candidates(artist, genre)
+        if minutes is None:
+            size = len(ids) if count is None else min(count, len(ids))
+            return [songs.get(i) for i in self.random.sample(ids, size)]
+
+        # a random pool keeps the knapsack small however big the catalog is
+        pool = self.random.sample(ids, min(self.pool_size, len(ids)))
+        durations = [songs.duration(i) for i in pool]
+        chosen = fill(durations, int(minutes * 60), count)
+        return [songs.get(pool[i]) for i in chosen]
+
+    def generate_many(self, n, artist=None, genre=None, minutes=None, count=None):
+        return [self.generate(artist, genre, minutes, count) for _ in range(n)]
+
+def fill(durations, target, count=None):
+    # bounded subset sum over bitsets, reach[c] has bit s set when c songs can add up to s seconds
+    if not durations or target <= 0:
+        return []
+    limit = max(1, target // max(1, min(durations)))
+    if count is not None:
+        limit = min(limit, count)
+    mask = (1 << (target + 1)) - 1
+    reach = [1] + [0] * limit
+    history = []
+    for d in durations:
+        history.append(reach)
+        reach = reach[:]
+        for c in range(limit, 0, -1):
+            reach[c] |= (history[-1][c - 1] << d) & mask
+
+    best, best_count = 0, 0
+    for c in range(1, limit + 1):
+        if reach[c]:
+            total = reach[c].bit_length() - 1
+            if total > best:
+                best, best_count = total, c
+    if not best:
+        return []
+
+    chosen = []
+    total, c = best, best_count
+    for i in range(len(durations) - 1, -1, -1):
+        before = history[i]
+        if before[c] >> total & 1:
+            continue
+        chosen.append(i)
+        total -= durations[i]
+        c -= 1
+    chosen.reverse()
+    return chosen
+
+_generator = None
+
+def get_generator():
+    global _generator
+    if _generator is None:
+        _generator = PlaylistGenerator()
+    return _generator
\ No newline at end of file
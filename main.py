@@ -1,5 +1,7 @@
 import pygame
-import scenes
+import storage
+import profiler
+import ui
 import sys
 
 WIDTH, HEIGHT = (1400, 900)
@@ -8,23 +10,98 @@ pygame.display.set_caption("OCRtunes")
 pygame.init()
 pygame.key.set_repeat(250, 50)
 
+# --sqlite keeps users and playlists in assets/ocrtunes.db, migrating the
+# JSON files the first time it runs
+if "--sqlite" in sys.argv:
+    storage.set_storage(storage.SQLiteStorage())
+
+# scenes build their widgets on import, so the display has to exist first
+# for the asset manager to convert images to the display format
+import scenes
+
+# --dirty-rects only repaints and flips the regions that changed,
+# --debug-dirty also outlines them on screen
+DIRTY_RECTS = "--dirty-rects" in sys.argv or "--debug-dirty" in sys.argv
+scenes.Scene.dirty_rects = DIRTY_RECTS
+scenes.Scene.debug_dirty = "--debug-dirty" in sys.argv
+
+# F3 shows frame times on screen and F4 times every widget, --profile-widgets
+# starts with widget timing on, --profile-out FILE.json|FILE.csv records every
+# frame and writes the trace on exit
+profile = profiler.get_profiler()
+profile.set_widget_timing("--profile-widgets" in sys.argv)
+PROFILE_OUT = sys.argv[sys.argv.index("--profile-out") + 1] if "--profile-out" in sys.argv else None
+profile.recording = PROFILE_OUT is not None
+
 clock = pygame.time.Clock()
-current_scene = scenes.MainMenu()
+current_scene = scenes.get_scene("main_menu")
+# built on quiet frames so logging in doesn't stall on them
+scenes.prewarm("library", "tutorial", "playlist_viewer", "playlist_maker", "settings")
 
+FPS = 60
+# an unfocused window keeps animating, just less often
+BACKGROUND_FPS = 10
+# when nothing is moving the loop sleeps in event.wait, these are the longest naps in ms
+IDLE_TIMEOUT = 500
+MINIMISED_TIMEOUT = 2000
+# frames run after input, widgets that reset themselves in update need one to be drawn
+SETTLE_FRAMES = 2
+
+settle = SETTLE_FRAMES
 while True:
-    clock.tick(60)
-    events = pygame.event.get()
+    shown = pygame.display.get_active()
+    if shown and (settle or current_scene.is_animating()):
+        # seconds since the last frame, animations move by time rather than by frame
+        dt = clock.tick(FPS if pygame.key.get_focused() else BACKGROUND_FPS) / 1000
+        events = pygame.event.get()
+    else:
+        if scenes.prewarm_step():
+            continue
+        # nothing would change on screen, so skip update and render until something happens
+        event = pygame.event.wait(IDLE_TIMEOUT if shown else MINIMISED_TIMEOUT)
+        if event.type == pygame.NOEVENT:
+            continue
+        events = [event] + pygame.event.get()
+        clock.tick()
+        profile.idle()
+        dt = 0
+
+    # runs of mouse motion become one event, widgets read the pointer from ui.INPUT
+    events = ui.INPUT.begin_frame(events)
     for event in events:
         if event.type == pygame.QUIT:
+            if PROFILE_OUT:
+                profile.export(PROFILE_OUT)
             pygame.quit()
             sys.exit()
+        if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            # the window contents may be gone
+            current_scene.invalidate()
+    settle = SETTLE_FRAMES if events else max(0, settle - 1)
 
-    current_scene.process_input(events)
-    current_scene.update()
-    current_scene.render(WIN)
-    pygame.display.update()
+    profile.start_frame(events)
+    profile.measure("process_input", current_scene.process_input, events)
+    current_scene.animator.update(dt)
+    profile.measure("update", current_scene.update)
+    if shown:
+        profile.measure("render", current_scene.render, WIN)
+        if profile.overlay:
+            # repainted by the scene next frame, the same as the debug overlay
+            rect = profile.draw(WIN)
+            if DIRTY_RECTS:
+                current_scene.overlay_rects.append(rect)
+                current_scene.damaged.append(rect)
+        if DIRTY_RECTS:
+            profile.measure("display", pygame.display.update, current_scene.damaged)
+        else:
+            profile.measure("display", pygame.display.update)
+    profile.end_frame()
+    if not events:
+        scenes.prewarm_step()
 
     next_scene = current_scene.next_scene
     if next_scene is not current_scene:
         current_scene.next_scene = current_scene
-        current_scene = next_scene
\ No newline at end of file
+        current_scene = next_scene
+        current_scene.invalidate()
+        settle = SETTLE_FRAMES
\ No newline at end of file
@@ -0,0 +1,63 @@
+import pygame
+import numpy as np
+import asset_manager
+
+class ParticleEngine:
+    def __init__(self, sprites, sizes, capacity=4096, seed=None):
+        self.capacity = capacity
+        # every sprite is pre-scaled once to each size, particles just index into the atlas
+        self.atlas = np.empty(len(sprites) * len(sizes), dtype=object)
+        self.atlas[:] = [pygame.transform.scale(asset_manager.load(sprite), (size, size)) for sprite in sprites for size in sizes]
+        self.max_size = max(sizes)
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.sprite = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+        self.count = 0
+
+    def emit(self, n, origin, vx=(0, 0), vy=(0, 0), life=(60, 60)):
+        n = min(n, len(self.free))
+        if n <= 0:
+            return
+        slots = np.array(self.free[-n:], dtype=np.intp)
+        del self.free[-n:]
+        self.pos[slots] = origin
+        self.vel[slots, 0] = self.rng.uniform(vx[0], vx[1], n)
+        self.vel[slots, 1] = self.rng.uniform(vy[0], vy[1], n)
+        self.life[slots] = self.rng.integers(life[0], life[1], n, endpoint=True)
+        self.sprite[slots] = self.rng.integers(0, len(self.atlas), n)
+        self.alive[slots] = True
+        self.count += n
+
+    def update(self):
+        if not self.count:
+            return
+        self.pos[self.alive] += self.vel[self.alive]
+        self.life[self.alive] -= 1
+        died = np.flatnonzero(self.alive & (self.life <= 0))
+        if len(died):
+            self.alive[died] = False
+            self.free.extend(died.tolist())
+            self.count -= len(died)
+
+    def get_bounds(self):
+        if not self.count:
+            return None
+        live = self.pos[self.alive]
+        x, y = live.min(axis=0)
+        right, bottom = live.max(axis=0)
+        return pygame.Rect(int(x), int(y), int(right - x) + self.max_size + 1, int(bottom - y) + self.max_size + 1)
+
+    def draw(self, screen):
+        if not self.count:
+            return
+        live = np.flatnonzero(self.alive)
+        screen.blits(zip(self.atlas[self.sprite[live]], self.pos[live].tolist()), doreturn=False)
+
+    def clear(self):
+        self.alive[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
\ No newline at end of file
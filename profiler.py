@@ -0,0 +1,191 @@
+import csv
+import json
+import time
+import pygame
+from collections import deque
+import ui
+
+PHASES = ["process_input", "update", "render", "display", "frame", "latency"]
+TRACE_FIELDS = ["frame", "time", "events", "process_input", "update", "render", "display", "frame_time", "latency"]
+WIDGET_METHODS = ["handle_event", "update", "draw"]
+OVERLAY_KEY = pygame.K_F3
+WIDGET_KEY = pygame.K_F4
+
+class RollingHistogram:
+    # the last few hundred samples, enough for stable percentiles without growing forever
+    def __init__(self, size=300):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))]
+
+    def mean(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+    def __len__(self):
+        return len(self.samples)
+
+class Profiler:
+    def __init__(self, window=300):
+        self.window = window
+        self.phases = {phase: RollingHistogram(window) for phase in PHASES}
+        self.widgets = {}
+        self.trace = []
+        self.recording = False
+        self.overlay = False
+        self.widget_timing = False
+        self.frame = 0
+        self.frame_start = None
+        self.input_time = None
+        self.current = {}
+        self.originals = {}
+        self.timing = set()
+
+    def start_frame(self, events):
+        now = time.perf_counter()
+        self.current = {"frame": self.frame + 1, "time": now, "events": len(events)}
+        if self.frame_start is not None:
+            self.phases["frame"].add(now - self.frame_start)
+            self.current["frame_time"] = now - self.frame_start
+        self.frame_start = now
+        self.frame += 1
+        # pygame events carry no timestamp, so latency is measured from the poll that delivered them
+        self.input_time = now if events else None
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                self.overlay = not self.overlay
+            elif event.type == pygame.KEYDOWN and event.key == WIDGET_KEY:
+                self.set_widget_timing(not self.widget_timing)
+
+    def idle(self):
+        # time spent asleep waiting for input isn't a frame
+        self.frame_start = None
+
+    def measure(self, phase, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        self.phases[phase].add(elapsed)
+        self.current[phase] = elapsed
+        return result
+
+    def end_frame(self):
+        if self.input_time is not None:
+            latency = time.perf_counter() - self.input_time
+            self.phases["latency"].add(latency)
+            self.current["latency"] = latency
+        if self.recording:
+            self.trace.append(self.current)
+
+    def record_widget(self, widget, method, elapsed):
+        key = (type(widget).__name__, widget.x, widget.y, method)
+        if key not in self.widgets:
+            self.widgets[key] = RollingHistogram(self.window)
+        self.widgets[key].add(elapsed)
+
+    def set_widget_timing(self, enabled):
+        # wraps the widget classes in place, so it costs nothing while off
+        if enabled and not self.widget_timing:
+            for cls in widget_classes():
+                for method in WIDGET_METHODS:
+                    if method in cls.__dict__:
+                        self.originals[(cls, method)] = cls.__dict__[method]
+                        setattr(cls, method, self._timed(cls.__dict__[method], method))
+        elif not enabled and self.widget_timing:
+            for (cls, method), function in self.originals.items():
+                setattr(cls, method, function)
+            self.originals = {}
+        self.widget_timing = enabled
+
+    def _timed(self, function, method):
+        def timed(widget, *args):
+            # a subclass calling super() would otherwise be timed once per class in the chain
+            key = (id(widget), method)
+            if key in self.timing:
+                return function(widget, *args)
+            self.timing.add(key)
+            start = time.perf_counter()
+            try:
+                return function(widget, *args)
+            finally:
+                self.record_widget(widget, method, time.perf_counter() - start)
+                self.timing.discard(key)
+        return timed
+
+    def slowest_widgets(self, count=5):
+        totals = {}
+        for (name, x, y, method), histogram in self.widgets.items():
+            totals[(name, x, y)] = totals.get((name, x, y), 0) + histogram.mean()
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def summary(self):
+        return {
+            phase: {
+                "mean_ms": histogram.mean() * 1e3,
+                "p50_ms": histogram.percentile(50) * 1e3,
+                "p95_ms": histogram.percentile(95) * 1e3,
+                "p99_ms": histogram.percentile(99) * 1e3,
+                "samples": len(histogram),
+            }
+            for phase, histogram in self.phases.items()
+        }
+
+    def export(self, path):
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=TRACE_FIELDS, restval="")
+                writer.writeheader()
+                writer.writerows(self.trace)
+        else:
+            widgets = [
+                {"widget": name, "x": x, "y": y, "method": method, "mean_ms": histogram.mean() * 1e3, "p95_ms": histogram.percentile(95) * 1e3}
+                for (name, x, y, method), histogram in self.widgets.items()
+            ]
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "widgets": widgets, "frames": self.trace}, f, indent=4)
+
+    def draw(self, screen):
+        frame = self.phases["frame"].mean()
+        lines = [
+            f"FPS {1 / frame if frame else 0:.0f}",
+            f"frame p50 {self.phases['frame'].percentile(50) * 1e3:.2f}  p95 {self.phases['frame'].percentile(95) * 1e3:.2f}  p99 {self.phases['frame'].percentile(99) * 1e3:.2f} ms",
+        ]
+        for phase in ["process_input", "update", "render", "display", "latency"]:
+            histogram = self.phases[phase]
+            lines.append(f"{phase} p50 {histogram.percentile(50) * 1e3:.2f}  p95 {histogram.percentile(95) * 1e3:.2f} ms")
+        if self.widget_timing:
+            for (name, x, y), total in self.slowest_widgets():
+                lines.append(f"{name} ({x}, {y}) {total * 1e3:.3f} ms")
+
+        # the numbers change every frame, so these skip the text cache
+        surfaces = [ui.BUTTON_FONT.render(line, True, ui.COLOURS["WHITE"]) for line in lines]
+        height = ui.FONTS.line_height(ui.BUTTON_FONT)
+        rect = pygame.Rect(5, 5, max(surface.get_width() for surface in surfaces) + 20, height * len(lines) + 10)
+        panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, surface in enumerate(surfaces):
+            panel.blit(surface, (10, 5 + i * height))
+        return screen.blit(panel, rect)
+
+def widget_classes():
+    classes = []
+    pending = [ui.UIElement]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+_profiler = None
+
+def get_profiler():
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
\ No newline at end of file
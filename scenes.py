@@ -1,10 +1,18 @@
 import pygame
 import ui
+import asset_manager
+import particles
+import catalog
+import storage
+import search_index
+import generator
+import covers
+import state
+import animation
+import dispatch
 import os
-import random
-import json
 from datetime import datetime
-from file_handler import handle_image_change
+from file_handler import ImageImporter
 
 pygame.init()
 
@@ -29,33 +37,170 @@ ASSETS = {
     "CROSS": os.path.join(BASE_PATH, "assets/images/cross.png"),
     "CHANGE_IMG": os.path.join(BASE_PATH, "assets/images/change_image.png"),
     "EDIT": os.path.join(BASE_PATH, "assets/images/edit.png"),
-    "USERS": os.path.join(BASE_PATH, "assets/users.json"),
-    "PLAYLISTS": os.path.join(BASE_PATH, "assets/playlists.json"),
-    "SONGS": os.path.join(BASE_PATH, "assets/song_list.json"),
 }
 
+# shared app state, derived values are only recomputed when one of their inputs changes
+STORE = state.Store(username=None, playlists=0, draft=[], genre_filters=(), artist_filter=None, catalog=None)
+STORE.derive("user_playlists", ["username", "playlists"], lambda username, _: storage.get_storage().get_playlist_names(username) if username else [])
+
+def _next_playlist_name(user_playlists):
+    user_playlists = set(user_playlists)
+    length = len(user_playlists) + 1
+    while True:
+        if f"My Playlist #{length}" not in user_playlists:
+            return f"My Playlist #{length}"
+        else:
+            length += 1
+
+def _filter_catalog(version, genres, artist):
+    return catalog.get_catalog().query_ids(artist=artist, genres=genres)
+
+def _draft_ids(version, draft):
+    # matched by name and artist, playlists loaded from storage hold their own records
+    songs = catalog.get_catalog()
+    return {song_id for song in draft for song_id in songs.find_ids(song)}
+
+STORE.derive("next_name", ["user_playlists"], _next_playlist_name)
+STORE.derive("filtered", ["catalog", "genre_filters", "artist_filter"], _filter_catalog)
+STORE.derive("draft_ids", ["catalog", "draft"], _draft_ids)
+# a view over the filtered ids, so adding a song to the draft doesn't copy the catalog
+STORE.derive("other_songs", ["filtered", "draft_ids"], lambda ids, draft_ids: catalog.SongSubset(catalog.get_catalog().songs, ids, draft_ids))
+
+class Session:
+    # who is logged in, every scene reads it from here
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def username(self):
+        return self.store["username"]
+
+    def login(self, username):
+        self.store.set("username", username)
+
+    def logout(self):
+        self.store.set("username", None)
+
+SESSION = Session(STORE)
+
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # keep folding overlapping rects in until nothing else touches this one
+        while (i := rect.collidelist(merged)) != -1:
+            rect.union_ip(merged.pop(i))
+        merged.append(rect)
+    return merged
+
 class Scene:
+    # dirty rectangle rendering is opt-in, main.py switches it on for every scene
+    dirty_rects = False
+    debug_dirty = False
+
     def __init__(self):
         self.next_scene = self
         self.ui_elements = []
+        self.background = None
+        self.redraw = True
+        self.damaged = []
+        self.overlay_rects = []
+        self.blit_area = 0
+        self.animator = animation.Animator()
+        self._dispatcher = None
+
+    @property
+    def username(self):
+        return SESSION.username
+
+    @property
+    def dispatcher(self):
+        # made on first use, the widgets don't exist yet when Scene.__init__ runs
+        if self._dispatcher is None:
+            self._dispatcher = dispatch.Dispatcher(self.ui_elements)
+        return self._dispatcher
+
+    def dispatch(self, event):
+        # hands the event to the widgets it is meant for and returns them
+        return self.dispatcher.dispatch(event)
 
     def process_input(self, events):
         for event in events:
-            for element in self.ui_elements:
-                element.handle_event(event)
+            self.dispatch(event)
 
     def update(self):
         for element in self.ui_elements:
             element.update()
+        self.dispatcher.invalidate()
 
-    def render(self, screen):
+    def invalidate(self):
+        self.redraw = True
+
+    def is_animating(self):
+        # anything that changes the screen without input, main.py sleeps while this is False
+        return self.animator.is_animating()
+
+    def get_damage(self):
+        damage = []
+        for element in self.ui_elements:
+            damage.extend(element.get_damage())
+        return damage
+
+    def draw_background(self, screen):
+        if self.background:
+            screen.blit(asset_manager.load(self.background, alpha=False), (0, 0))
+        else:
+            screen.fill(ui.COLOURS["WHITE"])
+
+    def draw_elements(self, screen, area=None):
         for element in self.ui_elements:
-            element.draw(screen)
+            if element.visible and (area is None or element.get_bounds().colliderect(area)):
+                element.draw(screen)
+
+    def render(self, screen):
+        if not self.dirty_rects:
+            self.draw_background(screen)
+            self.draw_elements(screen)
+            # the whole screen gets flipped, there's nothing to track
+            self.overlay_rects = []
+            self.damaged = []
+            return
+
+        # always collect damage so every element's state is recorded
+        damage = self.get_damage()
+        if self.redraw:
+            rects = [screen.get_rect()]
+            self.redraw = False
+        else:
+            rects = merge_rects([rect.clip(screen.get_rect()) for rect in damage + self.overlay_rects])
+            rects = [rect for rect in rects if rect.width and rect.height]
+
+        for rect in rects:
+            screen.set_clip(rect)
+            self.draw_background(screen)
+            self.draw_elements(screen, rect)
+        screen.set_clip(None)
+        self.blit_area = sum(rect.width * rect.height for rect in rects)
+
+        self.overlay_rects = []
+        if self.debug_dirty:
+            self.overlay_rects = self._draw_debug_overlay(screen, rects)
+        self.damaged = rects + self.overlay_rects
+
+    def _draw_debug_overlay(self, screen, rects):
+        for rect in rects:
+            pygame.draw.rect(screen, ui.COLOURS["RED"], rect, 1)
+        percent = self.blit_area / (screen.get_width() * screen.get_height()) * 100
+        txt_surface = ui.render_text(ui.BUTTON_FONT, f"repainted {self.blit_area}px ({percent:.1f}%)", ui.COLOURS["RED"])
+        label = screen.blit(txt_surface, (5, screen.get_height() - txt_surface.get_height() - 5))
+        # the outlines have to be painted over again next frame
+        return rects + [label]
 
 class MainMenu(Scene):
     def __init__(self):
         super().__init__()
-        self.particles = []
+        self.particles = particles.ParticleEngine(PARTICLES, sizes=range(32, 73, 8))
+        self.particle_bounds = None
         self.ui_elements = [
             (error_text:= ui.TextBox(850, 650, 500, 50, text="", background=False)),
             (sign_up:= ui.Button(825, 550, 225, 50, text="Sign Up", redirect="tutorial")),
@@ -76,14 +221,18 @@ class MainMenu(Scene):
         self.l_password = l_password
 
         self.error_text.text_colour = ui.COLOURS["RED"]
-        self.error_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
+        self.error_text.font = ui.FONTS.get("BOLD", 32)
+        self.background = ASSETS["MENU_BG"]
         self.sign_up.bg_colour = ui.COLOURS["DARK_BLUE"]
         self.log_in.bg_colour = ui.COLOURS["DARK_BLUE"]
 
+    def is_animating(self):
+        # the particles never stop
+        return True
+
     def process_input(self, events):
         for event in events:
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if type(element) == ui.Button and element.active:
                     if element == self.sign_up:
                         info = {
@@ -102,51 +251,34 @@ class MainMenu(Scene):
 
                     if (result := self.validate_login(info)) is True:
                         self._reset()
-                        if self.users[info['username']].get('ADMIN', {}):
-                            self.next_scene = globals()["admin_panel"]
+                        if storage.get_storage().get_user(info['username']).get('ADMIN', {}):
+                            self.next_scene = get_scene("admin_panel")
                         else:
-                            # update username across all scenes
-                            globals()["tutorial"].username = info['username']
-                            globals()["library"].username = info['username']
-                            globals()["playlist_maker"].username = info['username']
-                            globals()["playlist_viewer"].username = info['username']
-                            globals()["settings"].username = info['username']
-                            self.next_scene = globals()[element.redirect]
+                            SESSION.login(info['username'])
+                            self.next_scene = get_scene(element.redirect)
                     else:
                         self.error_text.text = result[1]
 
     def update(self):
         super().update()
         # particle manager
-        if len(self.particles) <= 4:
-            self.particles.append(
-                [
-                    [450, 500], # position
-                    (random.randint(5, 20) / 8, -2), # (x, y) velocity
-                    random.randint(20, 100), # timer
-                    pygame.image.load(random.choice(PARTICLES)), # image
-                    (width := random.randint(32, 72), width) # size
-                ]
-            )
-
-    def render(self, screen):
-        screen.blit(pygame.image.load(ASSETS["MENU_BG"]), (0, 0))
-        super().render(screen)
-        particles_to_remove = []
-        for particle in self.particles:
-            particle[0][0] += particle[1][0]
-            particle[0][1] += particle[1][1]
-            particle[2] -= 1
-            if particle[2] <= 0:
-                particles_to_remove.append(particle)
-            else:
-                screen.blit(
-                    pygame.transform.scale(particle[3], particle[4]),
-                    (particle[0][0], particle[0][1]),
-                )
-
-        for particle in particles_to_remove:
-            self.particles.remove(particle)
+        if self.particles.count <= 4:
+            self.particles.emit(1, (450, 500), vx=(5/8, 20/8), vy=(-2, -2), life=(20, 100))
+        self.particles.update()
+
+    def get_damage(self):
+        damage = super().get_damage()
+        bounds = self.particles.get_bounds()
+        if self.particle_bounds:
+            damage.append(self.particle_bounds)
+        if bounds:
+            damage.append(bounds)
+        self.particle_bounds = bounds
+        return damage
+
+    def draw_elements(self, screen, area=None):
+        super().draw_elements(screen, area)
+        self.particles.draw(screen)
 
     def _reset(self):
         self.l_username.text = "Username"
@@ -156,33 +288,27 @@ class MainMenu(Scene):
         self.s_confirm_password.text = "Confirm Password"
 
     def validate_login(self, info):
-        self.users = {}
-
-        with open(ASSETS['USERS'], 'r') as f:
-            self.users = json.load(f)
+        users = storage.get_storage()
 
         if info['button_pressed'] == 'login':
-            if info['username'] in self.users:
-                if self.users[info['username']]['password'] == info['password']:
-                    return True
+            user = users.get_user(info['username'])
+            if user and user['password'] == info['password']:
+                return True
             return (False, "Invalid username or password")
         
         elif info['button_pressed'] == 'signup':
             if info['username'] == 'Username' or info['password'] == 'Password':
                 return (False, "Please fill in all fields")
-            if info['username'] not in self.users:
+            if not users.user_exists(info['username']):
                 if info['password'] == info['confirm_password']:
-                    self.users[info['username']] = {
+                    users.add_user(info['username'], {
                         'username': info['username'],
                         'password': info['password']
-                    }
+                    })
                 else:
                     return (False, "Passwords do not match")
             else:
                 return (False, "Username already exists")
-            
-            with open(ASSETS['USERS'], 'w') as f:
-                json.dump(self.users, f, indent=4)
 
         return True
 
@@ -190,6 +316,7 @@ class Tutorial(Scene):
     def __init__(self):
         super().__init__()
         self.input_rect = pygame.Rect(10, 90, 775, 775)
+        self.last_panel = self.input_rect.copy()
         self.animated = False
         self.ui_elements = [
             (error_text:= ui.TextBox(380, 20, 600, 50, text="", background=False)),
@@ -213,15 +340,14 @@ class Tutorial(Scene):
         for element in self.ui_elements:
             element.active_colour = ui.COLOURS["VANILLA"]
             element.text_colour = ui.COLOURS["BLACK"]
-            element.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
+            element.font = ui.FONTS.get("BOLD", 32)
             element.bg_colour = ui.COLOURS["CREAM"]
 
         self.error_text.text_colour = ui.COLOURS["RED"]
 
     def process_input(self, events):
         for event in events:
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if type(element) == ui.Button and element.active:
                     if element == self.submit:
                         info = {
@@ -231,47 +357,51 @@ class Tutorial(Scene):
                             'favourite_genre': self.favourite_genre.selected,
                         }
                         if (result := self.validate_info(info)) is True:
-                            self.next_scene = globals()[element.redirect]
+                            self.next_scene = get_scene(element.redirect)
                         else:
                             self.error_text.text = result[1]
                     else:
-                        with open(ASSETS['USERS'], 'r') as f:
-                            users = json.load(f)
-                            users.pop(self.username)
-                        with open(ASSETS['USERS'], 'w') as f:
-                            json.dump(users, f, indent=4)
-                        self.next_scene = globals()[element.redirect]
+                        storage.get_storage().delete_user(self.username)
+                        SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
 
     def update(self):
         super().update()
 
-    def render(self, screen):
+    def get_damage(self):
+        damage = super().get_damage()
+        if self.input_rect != self.last_panel:
+            damage += [self.last_panel, self.input_rect.copy()]
+            self.last_panel = self.input_rect.copy()
+        return damage
+
+    def draw_background(self, screen):
         screen.fill(ui.COLOURS["WHITE"])
-        if not self.animated:
-            self.animate(screen, [self.title])
-            self.animate(screen, self.info_boxes)
         pygame.draw.rect(screen, ui.COLOURS["DARK_BLUE"], self.input_rect, 0, 10)
-        super().render(screen)
 
-    def animate(self, screen, elements):
+    def render(self, screen):
         if not self.animated:
-            while self.input_rect.x < (screen.get_width() - self.input_rect.width)//2 - 10:
-                self.input_rect.x += 1
-                screen.fill(ui.COLOURS["WHITE"])
-                pygame.draw.rect(screen, ui.COLOURS["DARK_BLUE"], self.input_rect, 0, 25)
-                pygame.display.update()
-                pygame.time.delay(1)
-        x = 0
-        while x < 200:
-            for element in elements:
-                element.anti_aliasing = False
-                element.txt_surface.set_alpha(x)
-                element.draw(screen)
-                pygame.display.update()
-                element.anti_aliasing = True
-            pygame.time.delay(25)
-            x += 5
-        self.animated = True
+            self.intro(screen.get_width())
+            self.animated = True
+        super().render(screen)
+
+    def intro(self, width):
+        # only schedules the tweens, the frames keep coming while they play
+        self.show(self.ui_elements, False)
+        self.animator.tween(self.input_rect, "x", (width - self.input_rect.width)//2 - 10, 0.4, animation.ease_out_cubic)
+        self.fade_in([self.title], 0.4)
+        self.fade_in(self.info_boxes, 1.4)
+        self.animator.after(2.4, self.show, self.ui_elements)
+
+    def fade_in(self, elements, delay, duration=1.0):
+        for element in elements:
+            element.alpha = 0
+            self.animator.fade(element, 255, duration, delay=delay)
+        self.animator.after(delay, self.show, elements)
+
+    def show(self, elements, visible=True):
+        for element in elements:
+            element.visible = visible
 
     def validate_info(self, info):
         try:
@@ -297,20 +427,16 @@ class Tutorial(Scene):
         return True
 
     def save_info(self, info):
-        with open(ASSETS['USERS'], 'r') as f:
-            users = json.load(f)
-        users[self.username].update(info)
-        with open(ASSETS['USERS'], 'w') as f:
-            json.dump(users, f, indent=4)
+        storage.get_storage().update_user(self.username, info)
 
 class Library(Scene):
     def __init__(self):
         super().__init__()
-        self.songs = self._get_song_list()
+        self.songs = self._load_songs()
         self.init = True
         self.redirected = True
         self.ui_elements = [
-            (song_list:= ui.ItemList(180, 400, 750, 50, items=self.songs, max_items=7)),
+            (song_list:= ui.Table(180, 400, 750, 50, items=self.songs, max_items=7)),
             ui.TextBox(520, 350, 100, 50, text=f"Title{' '*35}Artist{' '*32}Genre{' '*30}Duration", background=False),
             ui.Button(0, 186, 200, 50, text="Home", background=False),
             ui.Button(0, 238, 200, 50, text="Make Playlist", background=False, redirect="playlist_maker"),
@@ -318,12 +444,14 @@ class Library(Scene):
             ui.Button(0, 783, 200, 50, text="Settings", background=False, redirect="settings"),
             ui.Button(0, 833, 200, 50, text="Log Out", background=False, redirect="main_menu"),
             (sort_name:= ui.Button(255, 362, 50, 50, icon=ASSETS["SORT"], background=False)),
+            (sort_artist:= ui.Button(484, 362, 50, 50, icon=ASSETS["SORT"], background=False)),
+            (sort_genre:= ui.Button(701, 362, 50, 50, icon=ASSETS["SORT"], background=False)),
             (sort_length:= ui.Button(937, 362, 50, 50, icon=ASSETS["SORT"], background=False)),
             (afrobeats:= ui.Button(172, 170, 200, 100, text="Afrobeats", background=False)),
             (rap:= ui.Button(325, 170, 200, 100, text="Rap", background=False)),
             (pop:= ui.Button(475, 170, 200, 100, text="Pop", background=False)),
             (rnb:= ui.Button(630, 170, 200, 100, text="RNB", background=False)),
-            (search:= ui.SearchBox(250, 18, 760, 60, reference=self._song_list, background=False)),
+            (search:= ui.SearchBox(250, 18, 760, 60, index=search_index.get_index(), background=False)),
             (artist:= ui.TextBox(1055, 110, 300, 50, text="Artist", editable=True, max_length=22)),
             (genre:= ui.DropDown(1250, 170, 60, 40, options=["Afrobeats", "Pop", "RNB", "Rap"], selected="Genre")),
             (length:= ui.TextBox(1090, 170, 100, 40, text="Length(m)", editable=True, max_length=2)),
@@ -344,7 +472,10 @@ class Library(Scene):
         self.length = length
         self.song_num = song_num
         self.sort_name = sort_name
+        self.sort_artist = sort_artist
+        self.sort_genre = sort_genre
         self.sort_length = sort_length
+        self.sort = None
         self.afrobeats = afrobeats
         self.pop = pop
         self.rnb = rnb
@@ -355,120 +486,57 @@ class Library(Scene):
         self.search = search
         for element in self.ui_elements:
             if element in self.genres:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
+                element.font = ui.FONTS.get("BOLD", 32)
             elif type(element) == ui.TextBox or type(element) == ui.Button:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
+                element.font = ui.FONTS.get("BOLD", 20)
         
         self.error_text.text_colour = ui.COLOURS["RED"]
         self.success_text.text_colour = ui.COLOURS["GREEN"]
-        self.error_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
-        self.success_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
+        self.error_text.font = ui.FONTS.get("BOLD", 20)
+        self.success_text.font = ui.FONTS.get("BOLD", 20)
+        self.background = ASSETS["LIBRARY_BG"]
     
     def _generate_playlist(self):
-        playlist = []
-
         num = int(self.song_num.selected) if self.song_num.selected != "Songs" else None
         genre = self.genre.selected if self.genre.selected != "Genre" else None
         length = min(max(int(self.length.text), 5), 20) if self.length.text != "Length(m)" else None
         artist = self.artist.text if self.artist.text != "Artist" else None
 
-        with open(ASSETS['SONGS'], "r") as f:
-            songs = json.load(f)
-            random.shuffle(songs)
-
         if not any([genre, length, num, artist]):
-            self.error_text.text = "Select either a maximum duration, a maximum number of songs, or an artist"
+            self.error_text.text = "Select either a total duration, a maximum number of songs, or an artist"
             return
 
-        for song in songs:
-            if artist and song['artist'].lower() != artist.lower():
-                continue
-            if genre and song['genre'] != genre:
-                continue
-            if length and self._parse_song_length(song) >= length:
-                continue
-            if num and len(playlist) >= num:
-                break
-            playlist.append(song)
-
-        if artist and not playlist:
+        if artist and not catalog.get_catalog().by_artist(artist):
             self.error_text.text = "Artist not in song library"
             return
 
+        # length is the total duration of the playlist in minutes
+        playlist = generator.get_generator().generate(artist=artist, genre=genre, minutes=length, count=num)
+
+        if not playlist:
+            self.error_text.text = "No songs match the selected options"
+            return
+
         return playlist
     
     def _sort_songs(self, by):
-        formatted_songs = []
-        for song in self.songs:
-            split = song.split("  ")
-            formatted_songs.append([s for s in split if s != '' and s != ' '])
-        if by == "name":
-            formatted_songs.sort()
-        elif by == "length":
-            formatted_songs.sort(key=lambda x: x[3].split(":")[0]*60 + x[3].split(":")[1])
-
-        self.song_list.items = self._get_song_list(songs=formatted_songs)
-
-    def _parse_song_length(self, song):
-        minutes, seconds = song['length'].split(":")
-        minutes, seconds = int(minutes), int(seconds)
-        return minutes + seconds / 60
-
-    def _get_song_list(self, songs=None):
-        final_list = []
-        space_width = ui.BUTTON_FONT.render(" ", True, (0, 0, 0)).get_width()
-
-        if not songs:
-            self._song_list = self._load_songs()
-        else:
-            self._song_list = [
-                {
-                    "name": song[0].strip(),
-                    "artist": song[1].strip(),
-                    "genre": song[2].strip(),
-                    "length": song[3].strip()
-                }
-                for song in songs
-            ]
+        # sorting the same column again flips the direction
+        reverse = self.sort == (by, False)
+        self.sort = (by, reverse)
+        self.song_list.items = catalog.get_catalog().sorted_view(by, reverse)
 
-        for song in self._song_list:
-            entry = ""
-            if type(song) == dict:
-                song = song.values()
-            for value in song:
-                entry += value
-                font_offset = ui.BUTTON_FONT.size(value)[0]
-                entry += " " * ((space_width*45 - font_offset)//space_width)
-            final_list.append(entry)
-
-        return final_list
-    
     def _load_songs(self):
-        with open(ASSETS["SONGS"], "r") as f:
-            return json.load(f)
+        return catalog.get_catalog().songs
 
-    def _get_playlists(self):
-        with open(ASSETS["PLAYLISTS"], "r") as f:
-            return json.load(f)
-    
     def _save_playlist(self, playlist):
-        users = self._get_playlists()
+        names = set(STORE["user_playlists"])
 
-        if self.username not in users:
-            users[self.username] = {}
-
-        length = len(users[self.username]) + 1
-        while f"My Playlist #{length}" in users[self.username]:
+        length = len(names) + 1
+        while f"My Playlist #{length}" in names:
             length += 1
 
-        users[self.username][f"My Playlist #{length}"] = {}
-        users[self.username][f"My Playlist #{length}"]["songs"] = playlist
-        users[self.username][f"My Playlist #{length}"]["img"] = ASSETS["DEFAULT"]
-
-        with open(ASSETS["PLAYLISTS"], "w") as f:
-            json.dump(users, f, indent=4)
-
-        globals()["playlist_viewer"].new = True
+        storage.get_storage().save_playlist(self.username, f"My Playlist #{length}", playlist, ASSETS["DEFAULT"])
+        STORE.touch("playlists")
 
     def _export_playlist(self, playlist):
         num = 1
@@ -482,7 +550,7 @@ class Library(Scene):
             else:
                 f.write(f"{self.artist2.text.title()}\n{'-'*len(self.artist2.text)}\n\n")
             for i, song in enumerate(playlist):
-                f.write("\n".join(f"{key}: {value}" for key, value in song.items()))
+                f.write("\n".join(f"{key}: {value}" for key, value in song.to_dict().items()))
                 if i < len(playlist) - 1:
                     f.write("\n\n")
 
@@ -491,28 +559,18 @@ class Library(Scene):
         return num
 
     def _reset_playlists(self):
-        if self.username not in self._get_playlists():
-            self.playlists.items = []
-            return
-        self.playlists.items = self._get_playlists()[self.username].keys()
-        self.playlists.dy = 0
-        self.playlists.update_slider()
+        self.playlists.items = STORE["user_playlists"]
+        self.playlists.scroll_to(0)
 
     def _get_artist_playlists(self):
-        songs = self._load_songs()
-        final = []
-        for song in songs:
-            if song['artist'].lower() == self.artist2.text.lower():
-                final.append(song)
-        return final
+        return catalog.get_catalog().by_artist(self.artist2.text)
 
     def process_input(self, events):
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self.error_text.text = ""
                 self.success_text.text = ""
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if type(element) == ui.Button and element.active:
                     if element == self.confirm:
                         playlist = self._generate_playlist()
@@ -525,18 +583,24 @@ class Library(Scene):
                             self.artist.text = "Artist"
                             self._reset_playlists()
                     if element.text == "Make Playlist":
-                        globals()["playlist_maker"]._reset()
+                        get_scene("playlist_maker")._reset()
                     if element.redirect:
-                        self.next_scene = globals()[element.redirect]
+                        if element.redirect == "main_menu":
+                            SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
                         self.init = True
                     if element == self.sort_name:
                         self._sort_songs("name")
+                    if element == self.sort_artist:
+                        self._sort_songs("artist")
+                    if element == self.sort_genre:
+                        self._sort_songs("genre")
                     if element == self.sort_length:
                         self._sort_songs("length")
 
         if self.playlists.selected or (self.artist2.text != self.artist2.org_text and not self.artist2.active):
             if self.playlists.selected:
-                playlist = self._get_playlists()[self.username][self.playlists.selected]['songs']
+                playlist = storage.get_storage().get_playlist(self.username, self.playlists.selected)['songs']
             else:
                 playlist = self._get_artist_playlists()
             
@@ -548,40 +612,28 @@ class Library(Scene):
         
         for genre in self.genres:
             if genre.active and not self.search.active:
-                globals()["playlist_maker"].filters.items[globals()["playlist_maker"].filters.items.index((genre.text, False))] = (genre.text, True)
-                self.next_scene = globals()["playlist_maker"]
-                globals()["playlist_maker"].filter_songs()
+                get_scene("playlist_maker")._reset()
+                get_scene("playlist_maker").filters.items[get_scene("playlist_maker").filters.items.index((genre.text, False))] = (genre.text, True)
+                self.next_scene = get_scene("playlist_maker")
+                get_scene("playlist_maker").filter_songs()
                 break
 
     def update(self):
         super().update()
         selected_song = self.search.selected or self.song_list.selected
         if selected_song:
-            if selected_song == self.search.selected:
-                for song in self._song_list:
-                    if song["name"] == selected_song[0]:
-                        selected_song = globals()["playlist_maker"]._format_song_list([song])[0]
-                        break
-            globals()["playlist_maker"]._reset([selected_song])
+            get_scene("playlist_maker")._reset([selected_song])
             self.search.selected = None
             self.song_list.selected = None
-            self.next_scene = globals()["playlist_maker"]
+            self.next_scene = get_scene("playlist_maker")
 
         if self.init:
             self._reset_playlists()
             self.init = False
-        
-    def render(self, screen):
-        screen.blit(pygame.image.load(ASSETS["LIBRARY_BG"]), (0, 0))
-        super().render(screen)
 
 class PlaylistMaker(Scene):
     def __init__(self):
         super().__init__()
-        self._song_list = self._load_songs()
-        self.new_playlist = []
-        self.other_songs = self._get_other_songs()
-        
         self.ui_elements = [
             ui.Button(0, 186, 198, 50, text="Home", background=False, redirect="library"),
             ui.Button(0, 238, 200, 50, text="Make Playlist", background=False),
@@ -590,8 +642,8 @@ class PlaylistMaker(Scene):
             ui.Button(0, 833, 200, 50, text="Log Out", background=False, redirect="main_menu"),
             (error_text:= ui.TextBox(320, 180, 750, 50, text="", background=False)),
             (filters:= ui.Checkboxes(1125, 270, 200, 45, items=["Afrobeats", "Pop", "RNB", "Rap"], background=False)),
-            (playlist:= ui.ItemList(220, 258, 750, 30, items=self.new_playlist, max_items=5, offset=12)),
-            (other_songs:= ui.ItemList(220, 550, 750, 30, items=self.other_songs, max_items=5, offset=12)),
+            (playlist:= ui.Table(220, 258, 750, 30, items=STORE["draft"], max_items=5, offset=12)),
+            (other_songs:= ui.Table(220, 550, 750, 30, items=STORE["other_songs"], max_items=5, offset=12)),
             (name:= ui.TextBox(320, 142, 750, 50, text="", editable=True, max_length=20, border_radius=0, background=False)),
             (filter_button:= ui.Button(1150, 600, 200, 50, text="Filter")),
             (artist:= ui.TextBox(1150, 470, 200, 50, text="Artist", editable=True, max_length=22)),
@@ -609,183 +661,103 @@ class PlaylistMaker(Scene):
         self.override = False
         self.filters = filters
 
-        self._reset_initial_slider()
-
         self.save.bg_colour = ui.COLOURS["DARK_BLUE"]
         self.save.active_colour = ui.COLOURS["LIGHT_BLUE"]
 
         for element in self.ui_elements:
             if type(element) == ui.TextBox or type(element) == ui.Button:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
-            elif type(element) == ui.ItemList:
+                element.font = ui.FONTS.get("BOLD", 20)
+            elif type(element) == ui.Table:
                 element.scene_colour = ui.COLOURS['LIGHT_BLUE']
                 element.slider_colour = ui.COLOURS['DARK_BLUE']
                 element.bg_colour = ui.COLOURS['CREAM']
 
         self.error_text.text_colour = ui.COLOURS["RED"]
-        self.error_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
-
-    def _reset_initial_slider(self):
-        self.playlist.items = self._song_list
-        self.playlist.dy = 0
-        self.playlist.update_slider()
-        self.playlist.items = self.new_playlist
-        
-    def _load_songs(self):
-        with open(ASSETS["SONGS"], "r") as f:
-            return json.load(f)
-
-    def _get_user_playlists(self):
-        with open(ASSETS["PLAYLISTS"], "r") as f:
-            users = json.load(f)
-            if self.username not in users:
-                self.user_playlists = {}
-            else:
-                self.user_playlists = users[self.username]
-
-    def _get_other_songs(self):
-        for song in self._song_list:
-            for value in self.new_playlist:
-                if song["name"] == value.split("  ")[0]:
-                    self._song_list.remove(song)
-
-        return self._format_song_list(self._song_list)
-    
-    def _format_song_list(self, song_list):
-        final_list = []
-        space_width = ui.BUTTON_FONT.render(" ", True, (0, 0, 0)).get_width()
-        for song in song_list:
-            entry = ""
-            for value in song.values():
-                entry += value
-                font_offset = ui.BUTTON_FONT.size(value)[0]
-                entry += " " * ((space_width*45 - font_offset)//space_width)
-            final_list.append(entry)
-
-        return final_list
-
-    def _get_playlist_num(self):
-        length = len(self.user_playlists) + 1
-        while True:
-            if f"My Playlist #{length}" not in self.user_playlists:
-                return f"My Playlist #{length}"
-            else:
-                length += 1
+        self.error_text.font = ui.FONTS.get("BOLD", 32)
+        self.background = ASSETS["PLAYLIST_BG"]
 
     def filter_songs(self):
-        self._reset()
-        self._song_list = self._load_songs()
-        selected_genres = [filter_[0] for filter_ in self.filters.items if filter_[1]]
-        if selected_genres:
-            self._song_list = [song for song in self._song_list if song["genre"] in selected_genres]
-        if self.artist.text != "Artist":
-            self._song_list = [song for song in self._song_list if song["artist"].lower() == self.artist.text.lower()]
-        self.other_songs.items = self._get_other_songs()
+        selected_genres = tuple(filter_[0] for filter_ in self.filters.items if filter_[1])
+        artist = self.artist.text if self.artist.text != "Artist" else None
+        STORE.set("genre_filters", selected_genres)
+        STORE.set("artist_filter", artist)
 
     def _save_playlist(self):
-        key = ["name", "artist", "genre", "length"]
-        final = []
-
-        with open(ASSETS["PLAYLISTS"], "r") as f:
-            users = json.load(f)
-
-        if self.username not in users:
-            users[self.username] = {}
-
-        if self.name.text in list(users[self.username].keys()) and not self.override:
+        if self.name.text in STORE["user_playlists"] and not self.override:
             self.error_text.text = "Playlist name already exists"
         else:
-            for item in self.new_playlist:
-                song_dict = {}
-                item = [x for x in item.split("  ") if x != '' and x != ' ']
-
-                for i, val in enumerate(item):
-                    song_dict[key[i]] = val
-                final.append(song_dict)
-
-                users[self.username][self.name.text] = {}
-                users[self.username][self.name.text]['songs'] = final
-                users[self.username][self.name.text]['img'] = ASSETS["DEFAULT"]
-        
-            with open(ASSETS["PLAYLISTS"], "w") as f:
-                json.dump(users, f, indent=4)
+            storage.get_storage().save_playlist(self.username, self.name.text, STORE["draft"], ASSETS["DEFAULT"])
+            STORE.touch("playlists")
 
             self.error_text.text = ""
 
-        globals()["playlist_viewer"].new = True
-
     def _reset(self, new=None):
-        if not new:
-            new = []
         self.filters.items = [(filter_, False) for filter_ in ["Afrobeats", "Pop", "RNB", "Rap"]]
-        self.new_playlist = new
-        self.playlist.items = new
-        self._song_list = self._load_songs()
-        self._reset_initial_slider()
-        self.other_songs.items = self._get_other_songs()
-        self.other_songs.dy = 0
-        self.other_songs.update_slider()
-        self._get_user_playlists()
-        self.name.org_text = self._get_playlist_num()
+        STORE.set("draft", list(new or []))
+        STORE.set("genre_filters", ())
+        STORE.set("artist_filter", None)
+        self.playlist.items = STORE["draft"]
+        self.playlist.scroll_to(0)
+        self.other_songs.items = STORE["other_songs"]
+        self.other_songs.scroll_to(0)
+        self.override = False
+        self.name.org_text = STORE["next_name"]
         self.name.text = self.name.org_text
         self.error_text.text = ""
 
     def process_input(self, events):
         for event in events:
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if element.active:
                     self.error_text.text = ""
                 if type(element) == ui.Button and element.active:
                     if element.redirect:
                         self._reset()
-                        self.next_scene = globals()[element.redirect]
+                        if element.redirect == "main_menu":
+                            SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
                     if element == self.filter_button:
                         self.filter_songs()
                     if element == self.save:
-                        if self.playlist.items:
+                        if STORE["draft"]:
                             self._save_playlist()
                             if self.error_text.text == "":
                                 self._reset()
-                                self.next_scene = globals()["library"]
+                                self.next_scene = get_scene("library")
                         else:
                             self.error_text.text = "Playlist is empty"
                 
         if self.other_songs.selected:
-            self.new_playlist.append(self.other_songs.selected)
+            STORE.set("draft", STORE["draft"] + [self.other_songs.selected])
             self.other_songs.selected = None
-            self.playlist.items = self.new_playlist
-            self.other_songs.items = self._get_other_songs()
             self.error_text.text = ""
 
         if self.playlist.selected:
-            self.new_playlist.remove(self.playlist.selected)
-            self.playlist.items = self.new_playlist
+            draft = list(STORE["draft"])
+            draft.pop(self.playlist.selected_index)
+            STORE.set("draft", draft)
             self.playlist.selected = None
-            self._song_list = self._load_songs()
-            self.other_songs.items = self._get_other_songs()
 
     def update(self):
-        super().update()
-        self._get_user_playlists()
+        version = catalog.get_catalog().version
+        if STORE["catalog"] != version:
+            STORE.set("catalog", version)
+        # all of these are cached in the store until their inputs change
         if not self.override:
-            self.name.org_text = self._get_playlist_num()
-        self.other_songs.items = self._get_other_songs()
-
-    def render(self, screen):
-        screen.blit(pygame.image.load(ASSETS["PLAYLIST_BG"]), (0, 0))
-        super().render(screen)
+            self.name.org_text = STORE["next_name"]
+        self.playlist.items = STORE["draft"]
+        self.other_songs.items = STORE["other_songs"]
+        super().update()
 
 class PlaylistViewer(Scene):
     def __init__(self):
-        self.username = None
         super().__init__()
         self.ui_elements = [
             ui.Button(0, 186, 198, 50, text="Home", background=False, redirect="library"),
             ui.Button(0, 238, 200, 50, text="Make Playlist", background=False, redirect="playlist_maker"),
             ui.Button(0, 288, 200, 50, text="My Playlists", background=False),
             ui.Button(0, 783, 200, 50, text="Settings", background=False, redirect="settings"),
-            ui.Button(0, 833, 200, 50, text="Log Out", background=False, redirect="playlist_viewer"),
+            ui.Button(0, 833, 200, 50, text="Log Out", background=False, redirect="main_menu"),
             (slide:=ui.PlaylistSlide(225, 80, 350, 250, items=self._get_playlists())),
             ui.TextBox(675, 20, 200, 50, text="My Playlists", background=False)
         ]
@@ -796,7 +768,7 @@ class PlaylistViewer(Scene):
             exit_button:=(ui.Button(1170, 125, 100, 100, icon=ASSETS["CROSS"])),
             song_length:=(ui.TextBox(505, 180, 200, 50, text="", background=False)),
             track_length:=(ui.TextBox(505, 210, 200, 50, text="", background=False)),
-            songs:=(ui.ItemList(350, 350, 750, 50, items=[], max_items=6)),
+            songs:=(ui.Table(350, 350, 750, 50, items=[], max_items=6)),
             delete:=(ui.Button(570, 260, 50, 50, icon=ASSETS["BIN"])),
             edit:=(ui.Button(520, 260, 50, 50, icon=ASSETS["EDIT"])),
             image:=(ui.Button(350, 145, 150, 150, icon=ASSETS["DEFAULT"], hover=ASSETS["CHANGE_IMG"])),
@@ -817,76 +789,62 @@ class PlaylistViewer(Scene):
         self.slide = slide
         self.slide.scene_colour = ui.COLOURS["WHITE"]
         self.new = True
+        self.importer = ImageImporter()
+        self.cover = None
         self.transparent_bg = pygame.Surface((1400, 900), pygame.SRCALPHA)
         self.tb_pos = (163, 0)
 
         for element in self.ui_elements:
             if type(element) == ui.TextBox or type(element) == ui.Button:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
+                element.font = ui.FONTS.get("BOLD", 20)
                 if element.text == "My Playlists" and type(element) == ui.TextBox:
-                    element.font = pygame.font.Font(ui.ASSETS["BOLD"], 36)
+                    element.font = ui.FONTS.get("BOLD", 36)
 
         for element in self.pop_up_elements:
             if type(element) == ui.TextBox:
                 element.centred = False
-                element.font = pygame.font.Font(ui.ASSETS["REGULAR"], 25)
+                element.font = ui.FONTS.get("REGULAR", 25)
                 if element == self.error_text:
                     element.text_colour = ui.COLOURS["RED"]
-                    element.font = pygame.font.Font(ui.ASSETS["BOLD"], 25)
-        self.playlist_name.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
+                    element.font = ui.FONTS.get("BOLD", 25)
+        self.playlist_name.font = ui.FONTS.get("BOLD", 32)
+        self.background = ASSETS["PLAYLIST_VIEW"]
+        self.was_deactivated = False
 
-    def _load_playlist(self):
-        with open(ASSETS["PLAYLISTS"], "r") as f:
-            return json.load(f)
-        
-    def _save_playlist(self, playlist):
-        with open(ASSETS["PLAYLISTS"], "w") as f:
-            json.dump(playlist, f, indent=4)
+    def is_animating(self):
+        # an image being imported or covers still decoding land without any input
+        return super().is_animating() or self.importer.pending() or covers.busy()
 
     def _get_playlists(self):
-        self.users = self._load_playlist()
-        if self.username not in self.users:
-            return []
-        return [ui.Playlist({playlist: vals}) for playlist, vals in self.users[self.username].items()]
+        # the slide only builds cards for the playlists it is showing
+        return [{playlist: vals} for playlist, vals in storage.get_storage().get_playlists(self.username).items()]
 
     def process_input(self, events):
         for event in events:
-            for element in self.active_elements:
-                if self.deactivated and element not in self.pop_up_elements:
-                    if element.rect.x in range(self.tb_pos[0], self.transparent_bg.get_width()-self.tb_pos[0]) and element.rect.y in range(self.tb_pos[1], self.transparent_bg.get_height()-self.tb_pos[1]):
-                        continue
-
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if element.active:
                     self.error_text.text = ""
                     if element == self.delete:
-                        self.users[self.username].pop(self.playlist_name.text)
-                        with open(ASSETS["PLAYLISTS"], "w") as f:
-                            json.dump(self.users, f, indent=4)
+                        storage.get_storage().delete_playlist(self.username, self.playlist_name.text)
+                        STORE.touch("playlists")
                         self.slide.items = self._get_playlists()
-                        self.deactivated = False
-                        self.active_elements = self.ui_elements
+                        self.close_pop_up()
 
                     if element == self.edit:
-                        self.deactivated = False
-                        self.active_elements = self.ui_elements
-                        self.next_scene = globals()["playlist_maker"]
+                        self.close_pop_up()
+                        self.next_scene = get_scene("playlist_maker")
                         self.next_scene._reset(self.songs.items)
                         self.next_scene.name.text = self.playlist_name.text
                         self.next_scene.name.org_text = self.playlist_name.text
                         self.next_scene.override = True
 
                     if element == self.exit_button:
-                        self.deactivated = False
-                        self.active_elements = self.ui_elements
+                        self.close_pop_up()
 
                     if element == self.image:
-                        result = handle_image_change(self.username, os.path.join(BASE_PATH, "assets/user_images"), (150,150))
-                        try:
-                            pygame.image.load(result)
-                            self._change_playlist_image(result)
-                        except:
-                            self.error_text.text = result
+                        # finishes in update, the scene keeps running while the image is picked and resized
+                        if not self.importer.start(self.playlist_name.text, os.path.join(BASE_PATH, "assets/user_images"), (150,150)):
+                            self.error_text.text = "Already importing an image"
                 else:
                     if element == self.playlist_name:
                         if self.playlist_name.text != self.playlist_name.org_text and self.playlist_name.text != "":
@@ -894,50 +852,53 @@ class PlaylistViewer(Scene):
 
                 if type(element) == ui.Button and element.active:
                     if element.redirect:
-                        self.next_scene = globals()[element.redirect]
+                        if element.redirect == "main_menu":
+                            SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
                             
         if self.slide.selected:
+            self.open_pop_up()
+            self.handle_pop_up()
+
+    def open_pop_up(self):
+        if not self.deactivated:
             self.deactivated = True
-            self.temp = self.slide.selected
             self.active_elements = self.ui_elements + self.pop_up_elements
-            self.handle_pop_up()
+            # a modal layer, nothing under the shading gets any pointer events
+            self.dispatcher.push_layer(self.pop_up_elements, pygame.Rect(self.tb_pos, self.transparent_bg.get_size()))
 
-    def _change_playlist_image(self, img):
-        self.users[self.username][self.playlist_name.text]["img"] = img
-        self._save_playlist(self.users)
-        self.image.update_icon(img)
-        self.temp.update_image(img)
+    def close_pop_up(self):
+        if self.deactivated:
+            self.deactivated = False
+            self.active_elements = self.ui_elements
+            self.dispatcher.pop_layer()
+
+    def _change_playlist_image(self, img, playlist_name):
+        if not storage.get_storage().playlist_exists(self.username, playlist_name):
+            return
+        storage.get_storage().set_playlist_image(self.username, playlist_name, img)
+        if self.deactivated and self.old_name == playlist_name:
+            self.cover = covers.request(img)
+        for item in self.slide.items:
+            if playlist_name in item:
+                item[playlist_name]["img"] = img
+        for card in self.slide.cards.values():
+            if card.info["Name"] == playlist_name:
+                card.update_image(img)
     
     def _handle_name_change(self):
-        if self.playlist_name.text not in self.users[self.username]:
-            self.users[self.username][self.playlist_name.text] = self.users[self.username].pop(self.old_name)
-            self._save_playlist(self.users)
+        if not storage.get_storage().playlist_exists(self.username, self.playlist_name.text):
+            storage.get_storage().rename_playlist(self.username, self.old_name, self.playlist_name.text)
+            self.importer.rename(self.old_name, self.playlist_name.text)
+            STORE.touch("playlists")
             self.slide.items = self._get_playlists()
             self.old_name = self.playlist_name.text
             self.playlist_name.org_text = self.playlist_name.text
-            self.users = self._load_playlist()
         else:
             self.error_text.text = "Playlist name already exists"
             self.playlist_name.text = self.old_name
             self.playlist_name.org_text = self.old_name
 
-    def _parse_song_length(self, song):
-        minutes, seconds = map(int, song['length'].split(":"))
-        return minutes + seconds / 60
-    
-    def _format_songs(self, songs):
-        final_list = []
-        space_width = ui.BUTTON_FONT.render(" ", True, (0, 0, 0)).get_width()
-        for song in songs:
-            entry = ""
-            for value in song.values():
-                entry += value
-                font_offset = ui.BUTTON_FONT.size(value)[0]
-                entry += " " * ((space_width*45 - font_offset)//space_width)
-            final_list.append(entry)
-
-        return final_list
-
     def handle_pop_up(self):
         self.info = self.slide.selected.old_info
         playlist_name = list(self.info.keys())[0]
@@ -947,38 +908,58 @@ class PlaylistViewer(Scene):
 
         songs = self.info[playlist_name]['songs']
         self.song_length.text = f"Total Songs: {len(songs)}"
-        total_length = round(sum(self._parse_song_length(song) for song in songs))
+        total_length = round(sum(song.minutes for song in songs))
         self.track_length.text = f"Total Length: {total_length} minutes"
-        self.songs.items = self._format_songs(songs)
+        self.songs.items = songs
 
         img_path = self.info[playlist_name]['img']
         if not os.path.exists(img_path):
             img_path = ASSETS["DEFAULT"]
-            self.users[self.username][playlist_name]["img"] = img_path
-            self._save_playlist(self.users)
+            storage.get_storage().set_playlist_image(self.username, playlist_name, img_path)
 
-        self.image.update_icon(img_path)
-        self.songs.dy = 0
-        self.songs.update_slider()
+        self.cover = covers.request(img_path)
+        self.songs.scroll_to(0)
         self.slide.selected = None
 
     def update(self):
+        for playlist_name, img, error in self.importer.poll():
+            if error:
+                self.error_text.text = error
+            elif img:
+                self._change_playlist_image(img, playlist_name)
+
         if self.new:
             self.slide.items = self._get_playlists()
             self.slide.dy = 0
             self.slide.update_slider()
             self.new = False
+        if self.deactivated:
+            self.image.icon = covers.get(self.cover) or asset_manager.load(ASSETS["DEFAULT"])
         for element in self.active_elements:
             element.update()
+        self.dispatcher.invalidate()
 
-    def render(self, screen):
-        screen.blit(pygame.image.load(ASSETS["PLAYLIST_VIEW"]), (0, 0))
-        super().render(screen)
+    def get_damage(self):
+        damage = []
+        for element in self.active_elements:
+            damage.extend(element.get_damage())
+        return damage
+
+    def draw_elements(self, screen, area=None):
+        super().draw_elements(screen, area)
         if self.deactivated:
             pygame.draw.rect(self.transparent_bg, (168, 182, 250, 200), self.transparent_bg.get_rect())
             screen.blit(self.transparent_bg, self.tb_pos) 
             for element in self.pop_up_elements:
-                element.draw(screen)
+                if area is None or element.get_bounds().colliderect(area):
+                    element.draw(screen)
+
+    def render(self, screen):
+        # the pop-up shades the whole scene when it opens or closes
+        if self.deactivated != self.was_deactivated:
+            self.was_deactivated = self.deactivated
+            self.invalidate()
+        super().render(screen)
 
 class Settings(Scene):
     def __init__(self):
@@ -1016,52 +997,42 @@ class Settings(Scene):
 
         for element in self.ui_elements:
             if type(element) == ui.Button:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 20)
+                element.font = ui.FONTS.get("BOLD", 20)
 
         self.error_text.text_colour = ui.COLOURS["RED"]
         self.success_text.text_colour = ui.COLOURS["GREEN"]
-        self.error_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
-        self.success_text.font = pygame.font.Font(ui.ASSETS["BOLD"], 32)
+        self.error_text.font = ui.FONTS.get("BOLD", 32)
+        self.success_text.font = ui.FONTS.get("BOLD", 32)
         self.error_text.centred = False
         self.success_text.centred = False
+        self.background = ASSETS["SETTINGS_BG"]
 
         self.delete_account.bg_colour = ui.COLOURS["RED"]
 
     def _get_user_info(self):
-        with open(ASSETS['USERS'], 'r') as f:
-            return json.load(f)
-
-    def _dump_user_info(self, users):
-        with open(ASSETS['USERS'], 'w') as f:
-            json.dump(users, f, indent=4)
+        return storage.get_storage().get_user(self.username)
 
     def _save_info(self, info):
-        users = self._get_user_info()
-        users[self.username].update(info)
-        self._dump_user_info(users)
+        storage.get_storage().update_user(self.username, info)
 
     def _update_username(self):
-        users = self._get_user_info()
-        users[self.change_username.text] = users.pop(self.username)
-        self._dump_user_info(users)
-        self.username = self.change_username.text
+        storage.get_storage().rename_user(self.username, self.change_username.text)
+        SESSION.login(self.change_username.text)
         self.change_username.org_text = self.username
 
     def _get_account_preferences(self):
-        users = self._get_user_info()
-        return users[self.username]["favourite_artist"], users[self.username]["favourite_genre"]
+        user = self._get_user_info()
+        return user["favourite_artist"], user["favourite_genre"]
 
     def _delete_account(self):
-        users = self._get_user_info()
-        users.pop(self.username)
-        self._dump_user_info(users)
+        storage.get_storage().delete_user(self.username)
 
     def _validate_username(self, username):
         if not username:
             return (False, "Please enter a username")
         if username == self.username:
             return (True, "")
-        if username in self._get_user_info():
+        if storage.get_storage().user_exists(username):
             return (False, "Username already exists")
         return (True, "")
         
@@ -1077,18 +1048,19 @@ class Settings(Scene):
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self.error_text.text = ""
                 self.success_text.text = ""
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if type(element) == ui.Button and element.active:
                     if element.redirect:
-                        self.next_scene = globals()[element.redirect]
+                        if element.redirect == "main_menu":
+                            SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
                         self.init = True
                     if element == self.confirm:
                         username = self.change_username.text
                         user_outcome = self._validate_username(username)
                         pass_outcome = self.validate_password()
                         if user_outcome[0] and pass_outcome[0]:
-                            new_password = self.change_password.text if pass_outcome[1] != "UNCHANGED" else self._get_user_info()[self.username]["password"]
+                            new_password = self.change_password.text if pass_outcome[1] != "UNCHANGED" else self._get_user_info()["password"]
                             self._save_info({"username": username, "password": new_password})
                             self._update_username()
                             self.success_text.text = "Account updated!"
@@ -1105,21 +1077,19 @@ class Settings(Scene):
 
                     if element == self.delete_account:
                         self._delete_account()
-                        self.next_scene = globals()["main_menu"]
+                        SESSION.logout()
+                        self.next_scene = get_scene("main_menu")
 
     def update(self):
         super().update()
-        if self.init:
+        # logging out leaves init set until someone logs back in
+        if self.init and self.username:
             self.fav_artist.text, self.fav_genre.selected = self._get_account_preferences()
             self.fav_artist.org_text = self.fav_artist.text
             self.change_username.text = self.username
             self.change_username.org_text = self.username
             self.init = False
 
-    def render(self, screen):
-        screen.blit(pygame.image.load(ASSETS["SETTINGS_BG"]), (0, 0))
-        super().render(screen)
-
 class Admin(Scene):
     def __init__(self):
         super().__init__()
@@ -1138,49 +1108,72 @@ class Admin(Scene):
 
         for element in self.ui_elements:
             if element.text in ["Afrobeats", "Pop", "RNB", "Rap"]:
-                element.font = pygame.font.Font(ui.ASSETS["BOLD"], 50)
+                element.font = ui.FONTS.get("BOLD", 50)
 
     def _get_average_lengths(self):
         averages = {}
-        with open(ASSETS["SONGS"], "r") as f:
-            songs = json.load(f)
-            for genre in ["Afrobeats", "Pop", "RNB", "Rap"]:
-                songs_for_genre = []
-                for song in songs:
-                    if song['genre'] == genre:
-                        songs_for_genre.append(song)
-                total = sum(self._parse_song_length(song) for song in songs_for_genre)
-                average = round(total / len(songs_for_genre), 2)
-                averages[genre] = average
+        songs = catalog.get_catalog()
+        for genre in ["Afrobeats", "Pop", "RNB", "Rap"]:
+            songs_for_genre = songs.by_genre(genre)
+            total = sum(song.minutes for song in songs_for_genre)
+            average = round(total / len(songs_for_genre), 2)
+            averages[genre] = average
 
         return averages
-    
-    def _parse_song_length(self, song):
-        minutes, seconds = song['length'].split(":")
-        minutes, seconds = int(minutes), int(seconds)
-        return minutes + seconds / 60
 
     def process_input(self, events):
         for event in events:
-            for element in self.ui_elements:
-                element.handle_event(event)
+            for element in self.dispatch(event):
                 if type(element) == ui.Button and element.active:
                     if element.redirect:
-                        self.next_scene = globals()[element.redirect]
+                        if element.redirect == "main_menu":
+                            SESSION.logout()
+                        self.next_scene = get_scene(element.redirect)
 
     def update(self):
         super().update()
 
-    def render(self, screen):
-        screen.fill(ui.COLOURS["WHITE"])
-        super().render(screen)
-
-globals().update({
-    "main_menu": MainMenu(),
-    "library": Library(),
-    "tutorial": Tutorial(),
-    "playlist_maker": PlaylistMaker(),
-    "playlist_viewer": PlaylistViewer(),
-    "settings": Settings(),
-    "admin_panel": Admin()
-})
+SCENES = {
+    "main_menu": MainMenu,
+    "library": Library,
+    "tutorial": Tutorial,
+    "playlist_maker": PlaylistMaker,
+    "playlist_viewer": PlaylistViewer,
+    "settings": Settings,
+    "admin_panel": Admin
+}
+_scenes = {}
+_prewarm = []
+
+def get_scene(name):
+    # scenes are only built the first time something navigates to them
+    if name not in _scenes:
+        _scenes[name] = SCENES[name]()
+    return _scenes[name]
+
+def prewarm(*names):
+    _prewarm.extend(names)
+
+def prewarm_step():
+    # builds at most one queued scene, main.py calls this on frames without input
+    while _prewarm:
+        name = _prewarm.pop(0)
+        if name not in _scenes:
+            get_scene(name)
+            return True
+    return False
+
+# registered once for the whole app and routed to whichever scene is built, so the store never holds on to a scene
+def _filters_changed(_):
+    if "playlist_maker" in _scenes:
+        _scenes["playlist_maker"].other_songs.scroll_to(0)
+
+def _playlists_changed(_):
+    # reload the cards whenever any scene changes the user's playlists
+    if "playlist_viewer" in _scenes:
+        _scenes["playlist_viewer"].new = True
+
+STORE.subscribe("genre_filters", _filters_changed)
+STORE.subscribe("artist_filter", _filters_changed)
+STORE.subscribe("playlists", _playlists_changed)
+STORE.subscribe("username", _playlists_changed)
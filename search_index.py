@@ -0,0 +1,131 @@
+import re
+from bisect import bisect_left
+from itertools import chain
+import catalog
+
+FIELDS = ["name", "artist", "genre"]
+FIELD_ALIASES = {"title": "name", "song": "name"}
+TOKEN = re.compile(r"\w+")
+# prefixes this short match most of the vocabulary, so their postings are merged when the index is built
+SHORT_PREFIX = 2
+# a longer prefix matching more tokens than this is merged into one list before searching
+MERGE_LIMIT = 8
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+def merge(lists):
+    # one sorted list of ids out of several
+    if len(lists) == 1:
+        return lists[0]
+    return sorted(set(chain.from_iterable(lists)))
+
+def seek(lists, song_id):
+    # the first id at or after song_id in any of the lists, None when they are all used up
+    found = None
+    for ids in lists:
+        i = bisect_left(ids, song_id)
+        if i < len(ids) and (found is None or ids[i] < found):
+            found = ids[i]
+    return found
+
+class SearchIndex:
+    def __init__(self, songs=None):
+        self.catalog = songs
+        self.songs = None
+        self.version = None
+        self.build()
+
+    def get_catalog(self):
+        return self.catalog or catalog.get_catalog()
+
+    def build(self):
+        songs = self.get_catalog()
+        # field -> token -> ids in catalog order, plus a sorted vocabulary for prefix lookups
+        self.postings = {field: {} for field in FIELDS}
+        for song_id, song in enumerate(songs.songs):
+            for field in FIELDS:
+                postings = self.postings[field]
+                for token in set(tokenize(getattr(song, field))):
+                    postings.setdefault(token, []).append(song_id)
+        self.vocab = {field: sorted(postings) for field, postings in self.postings.items()}
+        self.short = {field: self._merge_short(postings) for field, postings in self.postings.items()}
+        self.version = songs.version
+        self.songs = songs
+
+    def parse(self, query):
+        terms = []
+        for part in query.split():
+            field, _, value = part.rpartition(":")
+            field = FIELD_ALIASES.get(field.lower(), field.lower())
+            if field not in FIELDS:
+                field, value = None, part
+            for token in tokenize(value):
+                terms.append((field, token))
+        return terms
+
+    def search(self, query, limit=10):
+        songs = self.get_catalog()
+        if songs is not self.songs or songs.version != self.version:
+            self.build()
+        terms = self.parse(query)
+        if not terms:
+            return self.songs.songs[:limit]
+
+        lookups = [self._lookup(field, token) for field, token in terms]
+        if not all(lookups):
+            return []
+        # the narrowest term proposes ids, the others only have to confirm them
+        lookups.sort(key=lambda lists: sum(map(len, lists)))
+        return [self.songs.get(song_id) for song_id in self._intersect(lookups, limit)]
+
+    def _intersect(self, lookups, limit):
+        # ids come out in catalog order, so it can stop at the first limit matches
+        first, rest = lookups[0], lookups[1:]
+        found = []
+        candidate = seek(first, 0)
+        while candidate is not None and len(found) < limit:
+            for lists in rest:
+                next_id = seek(lists, candidate)
+                if next_id != candidate:
+                    break
+            else:
+                found.append(candidate)
+                next_id = candidate + 1
+            candidate = seek(first, next_id) if next_id is not None else None
+        return found
+
+    def _lookup(self, field, prefix):
+        # the sorted id lists of every token starting with prefix
+        lists = []
+        for field in ([field] if field else FIELDS):
+            if len(prefix) <= SHORT_PREFIX:
+                if prefix in self.short[field]:
+                    lists.append(self.short[field][prefix])
+                continue
+            vocab = self.vocab[field]
+            postings = self.postings[field]
+            matched = []
+            i = bisect_left(vocab, prefix)
+            while i < len(vocab) and vocab[i].startswith(prefix):
+                matched.append(postings[vocab[i]])
+                i += 1
+            if len(matched) > MERGE_LIMIT:
+                matched = [merge(matched)]
+            lists.extend(matched)
+        return lists
+
+    def _merge_short(self, postings):
+        groups = {}
+        for token, ids in postings.items():
+            for length in range(1, min(len(token), SHORT_PREFIX) + 1):
+                groups.setdefault(token[:length], []).append(ids)
+        return {prefix: merge(lists) for prefix, lists in groups.items()}
+
+_index = None
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = SearchIndex()
+    return _index
\ No newline at end of file
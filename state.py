@@ -0,0 +1,48 @@
+class Store:
+    def __init__(self, **values):
+        self.values = dict(values)
+        self.versions = {key: 0 for key in values}
+        self.listeners = {}
+        self.derived = {}
+
+    def get(self, key):
+        if key in self.derived:
+            return self._refresh(key)
+        return self.values[key]
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+        self.touch(key)
+
+    def touch(self, key):
+        # for values that were changed in place
+        self.versions[key] = self.versions.get(key, 0) + 1
+        for callback in self.listeners.get(key, []):
+            callback(self.values[key])
+
+    def subscribe(self, key, callback):
+        self.listeners.setdefault(key, []).append(callback)
+
+    def derive(self, key, inputs, function):
+        # recomputed lazily, and only when one of its inputs has a new version
+        self.derived[key] = [inputs, function, None, None]
+        self.versions[key] = 0
+
+    def version(self, key):
+        if key in self.derived:
+            self._refresh(key)
+        return self.versions[key]
+
+    def _refresh(self, key):
+        entry = self.derived[key]
+        inputs, function, seen, value = entry
+        current = tuple(self.version(name) for name in inputs)
+        if current != seen:
+            value = function(*(self.get(name) for name in inputs))
+            entry[2] = current
+            entry[3] = value
+            self.versions[key] += 1
+        return value
\ No newline at end of file
@@ -0,0 +1,275 @@
+import os
+import abc
+import json
+import sqlite3
+import catalog
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+USERS = os.path.join(BASE_PATH, "assets/users.json")
+PLAYLISTS = os.path.join(BASE_PATH, "assets/playlists.json")
+DATABASE = os.path.join(BASE_PATH, "assets/ocrtunes.db")
+
+# songs are catalog.Song records in memory and plain dicts on disk
+def dump_songs(songs):
+    return [song.to_dict() for song in songs]
+
+def load_songs(songs):
+    return [catalog.Song.from_dict(song) for song in songs]
+
+class Storage(abc.ABC):
+    @abc.abstractmethod
+    def get_user(self, username):
+        ...
+
+    def user_exists(self, username):
+        return self.get_user(username) is not None
+
+    @abc.abstractmethod
+    def add_user(self, username, info):
+        ...
+
+    @abc.abstractmethod
+    def update_user(self, username, info):
+        ...
+
+    @abc.abstractmethod
+    def rename_user(self, username, new_username):
+        ...
+
+    @abc.abstractmethod
+    def delete_user(self, username):
+        ...
+
+    @abc.abstractmethod
+    def get_playlists(self, username):
+        ...
+
+    def get_playlist(self, username, name):
+        return self.get_playlists(username).get(name)
+
+    def get_playlist_names(self, username):
+        return list(self.get_playlists(username))
+
+    def playlist_exists(self, username, name):
+        return self.get_playlist(username, name) is not None
+
+    @abc.abstractmethod
+    def save_playlist(self, username, name, songs, img):
+        ...
+
+    @abc.abstractmethod
+    def delete_playlist(self, username, name):
+        ...
+
+    @abc.abstractmethod
+    def rename_playlist(self, username, name, new_name):
+        ...
+
+    @abc.abstractmethod
+    def set_playlist_image(self, username, name, img):
+        ...
+
+class JSONStorage(Storage):
+    # rewrites the whole file on every change, fine for small installs
+    def __init__(self, users_path=USERS, playlists_path=PLAYLISTS):
+        self.users_path = users_path
+        self.playlists_path = playlists_path
+        self.users = self._read(users_path)
+        self.playlists = self._read(playlists_path)
+
+    def get_user(self, username):
+        return self.users.get(username)
+
+    def add_user(self, username, info):
+        self.users[username] = info
+        self._write(self.users_path, self.users)
+
+    def update_user(self, username, info):
+        self.users[username].update(info)
+        self._write(self.users_path, self.users)
+
+    def rename_user(self, username, new_username):
+        if username == new_username:
+            return
+        if new_username in self.users:
+            raise ValueError(f"username {new_username!r} is taken")
+        self.users[new_username] = self.users.pop(username)
+        if username in self.playlists:
+            self.playlists[new_username] = self.playlists.pop(username)
+        self._write(self.users_path, self.users)
+        self._write(self.playlists_path, self.playlists)
+
+    def delete_user(self, username):
+        self.users.pop(username)
+        self.playlists.pop(username, None)
+        self._write(self.users_path, self.users)
+        self._write(self.playlists_path, self.playlists)
+
+    def get_playlists(self, username):
+        return {name: {"songs": load_songs(playlist["songs"]), "img": playlist["img"]} for name, playlist in self.playlists.get(username, {}).items()}
+
+    def get_playlist_names(self, username):
+        return list(self.playlists.get(username, {}))
+
+    def get_playlist(self, username, name):
+        playlist = self.playlists.get(username, {}).get(name)
+        return {"songs": load_songs(playlist["songs"]), "img": playlist["img"]} if playlist else None
+
+    def save_playlist(self, username, name, songs, img):
+        self.playlists.setdefault(username, {})[name] = {"songs": dump_songs(songs), "img": img}
+        self._write(self.playlists_path, self.playlists)
+
+    def delete_playlist(self, username, name):
+        self.playlists[username].pop(name)
+        self._write(self.playlists_path, self.playlists)
+
+    def rename_playlist(self, username, name, new_name):
+        self.playlists[username][new_name] = self.playlists[username].pop(name)
+        self._write(self.playlists_path, self.playlists)
+
+    def set_playlist_image(self, username, name, img):
+        self.playlists[username][name]["img"] = img
+        self._write(self.playlists_path, self.playlists)
+
+    def _read(self, path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write(self, path, data):
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+class SQLiteStorage(Storage):
+    def __init__(self, path=DATABASE, migrate=True):
+        if migrate and not os.path.exists(path):
+            self._migrate(path)
+        self.conn = sqlite3.connect(path)
+        self._create_tables()
+
+    def _migrate(self, path):
+        # built under another name and moved into place, so a failed migration leaves no empty database to start from
+        temp = path + ".migrating"
+        if os.path.exists(temp):
+            os.remove(temp)
+        self.conn = sqlite3.connect(temp)
+        try:
+            self._create_tables()
+            migrate_from_json(self)
+        except Exception:
+            self.conn.close()
+            os.remove(temp)
+            raise
+        self.conn.close()
+        os.replace(temp, path)
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    info TEXT NOT NULL
+                )""")
+            # the unique index doubles as the index for lookups by username
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS playlists (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    img TEXT NOT NULL,
+                    songs TEXT NOT NULL,
+                    UNIQUE (username, name)
+                )""")
+
+    def get_user(self, username):
+        row = self.conn.execute("SELECT info FROM users WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add_user(self, username, info):
+        with self.conn:
+            self.conn.execute("INSERT INTO users (username, info) VALUES (?, ?)", (username, json.dumps(info)))
+
+    def update_user(self, username, info):
+        with self.conn:
+            user = self.get_user(username)
+            user.update(info)
+            self.conn.execute("UPDATE users SET info = ? WHERE username = ?", (json.dumps(user), username))
+
+    def rename_user(self, username, new_username):
+        if username == new_username:
+            return
+        if self.user_exists(new_username):
+            raise ValueError(f"username {new_username!r} is taken")
+        # a user and their playlists move together or not at all
+        with self.conn:
+            self.conn.execute("UPDATE users SET username = ? WHERE username = ?", (new_username, username))
+            self.conn.execute("UPDATE playlists SET username = ? WHERE username = ?", (new_username, username))
+
+    def delete_user(self, username):
+        with self.conn:
+            self.conn.execute("DELETE FROM users WHERE username = ?", (username,))
+            self.conn.execute("DELETE FROM playlists WHERE username = ?", (username,))
+
+    def get_playlists(self, username):
+        rows = self.conn.execute("SELECT name, img, songs FROM playlists WHERE username = ? ORDER BY id", (username,))
+        return {name: {"songs": load_songs(json.loads(songs)), "img": img} for name, img, songs in rows}
+
+    def get_playlist(self, username, name):
+        row = self.conn.execute("SELECT img, songs FROM playlists WHERE username = ? AND name = ?", (username, name)).fetchone()
+        return {"songs": load_songs(json.loads(row[1])), "img": row[0]} if row else None
+
+    def get_playlist_names(self, username):
+        rows = self.conn.execute("SELECT name FROM playlists WHERE username = ? ORDER BY id", (username,))
+        return [row[0] for row in rows]
+
+    def playlist_exists(self, username, name):
+        return self.conn.execute("SELECT 1 FROM playlists WHERE username = ? AND name = ?", (username, name)).fetchone() is not None
+
+    def save_playlist(self, username, name, songs, img):
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO playlists (username, name, img, songs) VALUES (?, ?, ?, ?)
+                ON CONFLICT (username, name) DO UPDATE SET img = excluded.img, songs = excluded.songs""",
+                (username, name, img, json.dumps(dump_songs(songs))))
+
+    def delete_playlist(self, username, name):
+        with self.conn:
+            self.conn.execute("DELETE FROM playlists WHERE username = ? AND name = ?", (username, name))
+
+    def rename_playlist(self, username, name, new_name):
+        with self.conn:
+            self.conn.execute("UPDATE playlists SET name = ? WHERE username = ? AND name = ?", (new_name, username, name))
+
+    def set_playlist_image(self, username, name, img):
+        with self.conn:
+            self.conn.execute("UPDATE playlists SET img = ? WHERE username = ? AND name = ?", (img, username, name))
+
+def migrate_from_json(database, users_path=USERS, playlists_path=PLAYLISTS):
+    source = JSONStorage(users_path, playlists_path)
+    with database.conn:
+        database.conn.executemany(
+            "INSERT OR REPLACE INTO users (username, info) VALUES (?, ?)",
+            [(username, json.dumps(info)) for username, info in source.users.items()])
+        database.conn.executemany(
+            "INSERT OR REPLACE INTO playlists (username, name, img, songs) VALUES (?, ?, ?, ?)",
+            [(username, name, playlist["img"], json.dumps(playlist["songs"]))
+             for username, playlists in source.playlists.items() for name, playlist in playlists.items()])
+
+_storage = None
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        _storage = JSONStorage()
+    return _storage
+
+def set_storage(storage):
+    global _storage
+    _storage = storage
+
+if __name__ == "__main__":
+    # one-shot migration of the JSON files into a fresh database
+    if os.path.exists(DATABASE):
+        print(f"{DATABASE} already exists")
+    else:
+        SQLiteStorage()
+        print(f"Migrated {USERS} and {PLAYLISTS} to {DATABASE}")
\ No newline at end of file
@@ -1,6 +1,11 @@
 import pygame
 import math
 import os
+import asset_manager
+import bundle
+import catalog
+import covers
+from collections import OrderedDict
 
 pygame.init()
 
@@ -23,9 +28,150 @@ ASSETS = {
     "BASE_PLAYLIST_IMG": os.path.join(BASE_PATH, "assets/images/default.png"),
     "PLAYLIST_INFO": os.path.join(BASE_PATH, "assets/images/playlist_info.png")
 }
-BUTTON_FONT = pygame.font.Font(ASSETS["REGULAR"], 20)
+
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}
+        self.metrics = {}
+
+    def get(self, face, size):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(bundle.open_blob(ASSETS[face]) or ASSETS[face], size)
+        return font
+
+    def preload(self, keys):
+        for face, size in keys:
+            self.get(face, size)
+
+    def height(self, font):
+        return self._get_metrics(font)["height"]
+
+    def line_height(self, font):
+        return self._get_metrics(font)["line_height"]
+
+    def _get_metrics(self, font):
+        metrics = self.metrics.get(font)
+        if metrics is None:
+            metrics = self.metrics[font] = {
+                "height": font.get_height(),
+                "line_height": font.get_linesize(),
+                "ascent": font.get_ascent(),
+                "descent": font.get_descent()
+            }
+        return metrics
+
+FONTS = FontRegistry()
+# every face/size combination the scenes use
+FONTS.preload([("REGULAR", 20), ("REGULAR", 25), ("BOLD", 20), ("BOLD", 25), ("BOLD", 32), ("BOLD", 36), ("BOLD", 50)])
+BUTTON_FONT = FONTS.get("REGULAR", 20)
+
+class TextCache:
+    def __init__(self, budget=8 * 1024 * 1024):
+        self.budget = budget # bytes of rendered text surfaces
+        self.cache = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, colour, antialias=True):
+        key = (font, text, colour, antialias)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        surface = font.render(text, antialias, colour)
+        size = asset_manager.surface_bytes(surface)
+        self.cache[key] = (surface, size)
+        self.used += size
+        self._evict()
+        return surface
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+    def _evict(self):
+        self.used, evicted = asset_manager.evict(self.cache, self.used, self.budget, lambda entry: entry[1])
+        self.evictions += evicted
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.cache),
+            "used": self.used,
+            "budget": self.budget
+        }
+
+TEXT_CACHE = TextCache()
+
+def render_text(font, text, colour, antialias=True):
+    return TEXT_CACHE.render(font, text, colour, antialias)
+
+class InputState:
+    # what the mouse and keyboard did this frame, read by widgets instead of asking pygame per event
+    def __init__(self):
+        self.pos = (0, 0)
+        self.buttons = (False, False, False)
+        self.rel = (0, 0)
+        self.wheel = (0, 0)
+        self.text = ""
+        self.motion_events = 0
+
+    def begin_frame(self, events):
+        # returns the events with every run of mouse motion folded into one event
+        self.rel = (0, 0)
+        self.wheel = (0, 0)
+        self.text = ""
+        self.motion_events = 0
+        buttons = list(self.buttons)
+        coalesced = []
+        run = []
+        for event in events + [None]:
+            if event is not None and event.type == pygame.MOUSEMOTION:
+                run.append(event)
+                continue
+            if run:
+                # the run's last position and buttons with all of its movement, in a new event
+                last = run[-1]
+                rels = [motion.rel for motion in run]
+                rel = (sum(r[0] for r in rels), sum(r[1] for r in rels))
+                coalesced.append(pygame.event.Event(pygame.MOUSEMOTION, pos=last.pos, rel=rel, buttons=last.buttons))
+                self.motion_events += len(run)
+                self.pos = last.pos
+                self.rel = (self.rel[0] + rel[0], self.rel[1] + rel[1])
+                buttons = [bool(button) for button in last.buttons[:3]]
+                run = []
+            if event is None:
+                break
+            coalesced.append(event)
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                self.pos = event.pos
+                if event.button <= 3:
+                    buttons[event.button - 1] = event.type == pygame.MOUSEBUTTONDOWN
+            elif event.type == pygame.MOUSEWHEEL:
+                self.wheel = (self.wheel[0] + event.x, self.wheel[1] + event.y)
+            elif event.type == pygame.TEXTINPUT:
+                self.text += event.text
+        self.buttons = tuple(buttons)
+        return coalesced
+
+# main.py feeds it once a frame, before the scene sees any events
+INPUT = InputState()
 
 class UIElement:
+    # whether the dispatcher sends this widget pointer events at all
+    interactive = True
+
     def __init__(self, x, y, width, height):
         self.x = x
         self.y = y
@@ -37,12 +183,53 @@ class UIElement:
         self.bg_colour = COLOURS["LIGHT_BLUE"]
         self.active_colour = COLOURS["DARK_BLUE"]
         self.current_colour = self.bg_colour
+        self.txt_surface = None
+        self.alpha = 255
+        self.visible = True
+        self._text_key = None
+        self._last_state = None
+        self._last_bounds = None
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.rect.collidepoint(event.pos):
                 self.active = not self.active
 
+    def get_bounds(self):
+        # everything draw() may paint, used for dirty rectangles
+        return self.rect.copy()
+
+    def hit_test(self, pos):
+        return self.get_bounds().collidepoint(pos)
+
+    def get_state(self):
+        # anything that changes what draw() paints
+        return (tuple(self.rect), self.current_colour)
+
+    def get_damage(self):
+        state = (self.visible, self.get_state())
+        if state == self._last_state:
+            return []
+        bounds = self.get_bounds()
+        damage = [bounds] if self._last_bounds is None else [self._last_bounds, bounds]
+        self._last_state = state
+        self._last_bounds = bounds
+        return damage
+
+    def update_text(self, text, antialias=True):
+        # only re-render when the text or its style actually changed
+        key = (self.font, text, self.text_colour, antialias, self.alpha)
+        if key != self._text_key:
+            self.txt_surface = render_text(*key[:4])
+            if self.alpha < 255:
+                # the cached surface is shared, so fade a copy of it
+                self.txt_surface = self.txt_surface.copy()
+                self.txt_surface.set_alpha(self.alpha)
+            self._text_key = key
+
+    def invalidate_text(self):
+        self._text_key = None
+
     def update(self):
         self.current_colour = self.active_colour if self.active else self.bg_colour
 
@@ -54,9 +241,9 @@ class Button(UIElement):
         super().__init__(x, y, width, height)
         self.hover_colour = None
         self.hover_pos = (self.rect.x, self.rect.y) if hover_pos == "DEFAULT" else hover_pos
-        self.icon = pygame.image.load(icon) if icon else None
+        self.icon = asset_manager.load(icon) if icon else None
         try:
-            self.hover = pygame.image.load(hover)
+            self.hover = asset_manager.load(hover)
         except:
             self.hover = None
             if hover:
@@ -69,19 +256,39 @@ class Button(UIElement):
         self.text_colour = COLOURS["WHITE"] if self.background else COLOURS["BLACK"]
 
     def update_icon(self, icon):
-        self.icon = pygame.image.load(icon)
+        self.icon = asset_manager.load(icon)
+
+    def get_text_pos(self):
+        return (self.rect.x + (self.rect.width - self.txt_surface.get_width()) // 2, self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2)
+
+    def hit_test(self, pos):
+        # the hover image is only decoration
+        return self.rect.collidepoint(pos)
+
+    def get_bounds(self):
+        bounds = self.rect.copy()
+        if self.icon:
+            bounds.union_ip(self.icon.get_rect(topleft=self.rect.topleft))
+        elif self.txt_surface:
+            bounds.union_ip(self.txt_surface.get_rect(topleft=self.get_text_pos()))
+        if self.hover:
+            bounds.union_ip(self.hover.get_rect(topleft=self.hover_pos))
+        return bounds
+
+    def get_state(self):
+        return (tuple(self.rect), self.current_colour, self.txt_surface, self.icon, self.hovering)
 
     def handle_event(self, event):
         super().handle_event(event)
         if event.type == pygame.MOUSEMOTION:
-            if self.rect.collidepoint(event.pos):
+            if self.rect.collidepoint(INPUT.pos):
                 if self.hover_colour or self.hover:
                     self.hovering = True
             else:
                 self.hovering = False
 
     def update(self):
-        self.txt_surface = self.font.render(self.text, True, self.text_colour)
+        self.update_text(self.text)
         self.current_colour = self.active_colour if self.active else self.bg_colour
         if self.hovering and self.hover_colour:
             self.current_colour = self.hover_colour
@@ -93,7 +300,7 @@ class Button(UIElement):
         if not self.icon:
             if self.background:
                 pygame.draw.rect(screen, self.current_colour, self.rect, 0, 25)
-            screen.blit(self.txt_surface, (self.rect.x + (self.rect.width - self.txt_surface.get_width()) // 2, self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2))
+            screen.blit(self.txt_surface, self.get_text_pos())
         else:
             screen.blit(self.icon, (self.rect.x, self.rect.y))
 
@@ -112,6 +319,10 @@ class TextBox(UIElement):
         self.centred = True
         self.anti_aliasing = True
 
+    @property
+    def interactive(self):
+        return self.editable
+
     def handle_event(self, event):
         if self.editable:
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -133,19 +344,33 @@ class TextBox(UIElement):
     def update(self):
         if not self.active and not self.text:
             self.text = self.org_text
-        self.txt_surface = self.font.render(self.text, self.anti_aliasing, self.text_colour)
+        self.update_text(self.text, self.anti_aliasing)
         self.current_colour = self.active_colour if self.active else self.bg_colour
 
+    def get_text_pos(self):
+        return (self.rect.x + ((self.rect.width - self.txt_surface.get_width()) // 2 if self.centred else 20) , self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2)
+
+    def get_bounds(self):
+        bounds = self.rect.copy()
+        if self.txt_surface:
+            bounds.union_ip(self.txt_surface.get_rect(topleft=self.get_text_pos()))
+        return bounds
+
+    def get_state(self):
+        return (tuple(self.rect), self.current_colour, self.txt_surface, self.background, self.centred)
+
     def draw(self, screen):
         if self.background:
             pygame.draw.rect(screen, self.current_colour, self.rect, 0, self.border_radius)
-        screen.blit(self.txt_surface, (self.rect.x + ((self.rect.width - self.txt_surface.get_width()) // 2 if self.centred else 20) , self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2))
+        screen.blit(self.txt_surface, self.get_text_pos())
 
 class SearchBox(TextBox):
-    def __init__(self, x, y, width, height, text='Search', max_length=float('inf'), reference=[], background=True, max_items=10):
+    def __init__(self, x, y, width, height, text='Search', max_length=float('inf'), index=None, background=True, max_items=10):
         super().__init__(x, y, width, height, text, max_length, background, editable=True)
         self.max_items = max_items
-        self.items = reference
+        self.index = index
+        self.query = None
+        self.results = []
         self.search_rects = []
         self.selected = None
         self.centred = False
@@ -163,26 +388,34 @@ class SearchBox(TextBox):
 
     def update(self):
         super().update()
+        # only hit the index when the query text or the catalog changed
+        query = (self.text, catalog.get_catalog().version)
+        if self.active and query != self.query:
+            self.query = query
+            self.results = self.index.search(self.text, self.max_items)
+            self._get_search_rects()
+
+    def get_bounds(self):
+        bounds = super().get_bounds()
+        if self.active and self.search_rects:
+            bounds.union_ip(self.search_rects[-1][1])
+        return bounds
+
+    def get_state(self):
+        return (super().get_state(), self.active, tuple(item.name for item, _ in self.search_rects) if self.active else ())
     
     def draw(self, screen):
         super().draw(screen)
         if self.active:
-            self._get_search_rects()
             for item, rect in self.search_rects:
                 pygame.draw.rect(screen, self.bg_colour, rect)
                 pygame.draw.rect(screen, COLOURS["BLACK"], rect, 1)
-                txt_surface = self.font.render(item[0], True, self.text_colour)
+                txt_surface = render_text(self.font, item.name, self.text_colour)
                 screen.blit(txt_surface, (rect.x + 20, rect.y + (rect.height - txt_surface.get_height()) // 2))
 
-    def _get_search_results(self):
-        items = [list(item.values()) for item in self.items]
-        return [item for item in items if any(self.text.lower() in i.lower() for i in item)]
-
     def _get_search_rects(self):
         self.search_rects = []
-        for i, item in enumerate(self._get_search_results()):
-            if len(self.search_rects) == self.max_items:
-                break
+        for i, item in enumerate(self.results):
             rect = pygame.Rect(self.x, self.y + self.height * (i + 1), self.width, self.height)
             self.search_rects.append((item, rect))
     
@@ -199,24 +432,45 @@ class DropDown(UIElement):
             if self.rect.collidepoint(event.pos):
                 self.active = not self.active
             if self.active:
-                for _, rect in self.option_rects:
-                    if rect.collidepoint(event.pos):
-                        self.selected, self.listed_options[self.option_rects.index((_, rect))] = self.listed_options[self.option_rects.index((_, rect))], self.selected
-                        self.active = False
+                index = self.get_option_at(event.pos)
+                if index is not None:
+                    self.selected, self.listed_options[index] = self.listed_options[index], self.selected
+                    self.active = False
+
+    def get_option_at(self, pos):
+        # options are stacked under the box, one height apart
+        if not self.x <= pos[0] < self.x + self.width:
+            return None
+        index = (pos[1] - self.y) // self.height - 1
+        return index if 0 <= index < len(self.option_rects) else None
 
     def update(self):
         self.dd_colour = self.bg_colour
-        self.txt_surface = self.font.render(self.selected, True, self.text_colour)
+        self.update_text(self.selected)
         self.current_colour = self.active_colour if self.active else self.bg_colour
         self.get_option_rects()
 
+    def get_text_pos(self):
+        return (self.rect.x + (self.rect.width - self.txt_surface.get_width()) // 2, self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2)
+
+    def get_bounds(self):
+        bounds = self.rect.copy()
+        if self.txt_surface:
+            bounds.union_ip(self.txt_surface.get_rect(topleft=self.get_text_pos()))
+        if self.active and self.option_rects:
+            bounds.union_ip(self.option_rects[-1][1])
+        return bounds
+
+    def get_state(self):
+        return (tuple(self.rect), self.current_colour, self.txt_surface, self.active, tuple(self.listed_options))
+
     def draw(self, screen):
         pygame.draw.rect(screen, self.current_colour, self.rect, 0, 5)
-        screen.blit(self.txt_surface, (self.rect.x + (self.rect.width - self.txt_surface.get_width()) // 2, self.rect.y + (self.rect.height - self.txt_surface.get_height()) // 2))
+        screen.blit(self.txt_surface, self.get_text_pos())
         if self.active:
             for option, rect in self.option_rects:
                 pygame.draw.rect(screen, self.dd_colour, rect, 0, 5)
-                txt_surface = self.font.render(option, True, self.text_colour)
+                txt_surface = render_text(self.font, option, self.text_colour)
                 screen.blit(txt_surface, (rect.x + (rect.width - txt_surface.get_width()) // 2, rect.y + (rect.height - txt_surface.get_height()) // 2))
 
     def get_option_rects(self):
@@ -243,18 +497,21 @@ class ItemList(UIElement):
         self.offset = offset
         self.max_items = max_items
         self.selected = None
-        self.dy = 0
+        self.selected_index = None
+        self.scroll = 0
         self.old_y = 0
-        self.max_height = (self.height+self.offset) * self.max_items 
+        self.row_height = self.height + self.offset
+        self.max_height = self.row_height * self.max_items 
         self.active = False
+        self.focused = False
         self.update_slider()
         self.get_item_rects()
         self.top_rect = pygame.Rect(self.x, self.y-self.height, self.width, self.height)
         self.bottom_rect = pygame.Rect(self.x, self.y+self.max_height-self.offset, self.width, self.height)
 
     def handle_event(self, event):
-        mouse_pos = pygame.mouse.get_pos()
-        buttons = pygame.mouse.get_pressed()
+        mouse_pos = INPUT.pos
+        buttons = INPUT.buttons
         if buttons[0]:
             if self.slider_rect.collidepoint(mouse_pos):
                 self.active = True
@@ -264,48 +521,135 @@ class ItemList(UIElement):
             self.active = False
             self.active_colour = self.slider_colour
         
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            for item, rect, on_screen in self.item_rects:
-                if rect.collidepoint(event.pos) and on_screen:
-                    self.selected = item
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+            self.focused = self.get_bounds().collidepoint(event.pos)
+            index = self.get_index_at(event.pos)
+            if index is not None:
+                self.selected = self.items[index]
+                self.selected_index = index
             if self.slider_rect.collidepoint(event.pos):
                 self.old_y = mouse_pos[1]
+
+        elif event.type == pygame.MOUSEWHEEL:
+            if self.get_bounds().collidepoint(mouse_pos):
+                self.scroll_to(self.scroll - event.y)
+
+        elif event.type == pygame.KEYDOWN and self.focused:
+            steps = {
+                pygame.K_UP: -1,
+                pygame.K_DOWN: 1,
+                pygame.K_PAGEUP: -self.max_items,
+                pygame.K_PAGEDOWN: self.max_items,
+                pygame.K_HOME: -len(self.items),
+                pygame.K_END: len(self.items)
+            }
+            if event.key in steps:
+                self.scroll_to(self.scroll + steps[event.key])
         
         if self.active:
             dy = mouse_pos[1] - self.old_y
-            if self.slider_rect.y + dy >= self.y and self.slider_rect.y + dy + self.slider_rect.height <= self.y + self.max_height:
-                self.dy -= dy
-                self.slider_rect.y += dy
+            track = self.max_height - self.slider_rect.height
+            if dy and track > 0:
+                self.scroll_to(self.scroll + dy / track * self.get_max_scroll())
                 self.old_y = mouse_pos[1]
-    
+
+    def hit_test(self, pos):
+        # the rows and the slider, not the covers above and below them
+        return self.x <= pos[0] < self.slider_rect.right and self.y <= pos[1] < self.y + self.max_height
+
+    def get_max_scroll(self):
+        return max(0, len(self.items) - self.max_items)
+
+    def scroll_to(self, scroll):
+        self.scroll = min(max(scroll, 0), self.get_max_scroll())
+        self.update_slider()
+
     def update_slider(self):
-        total_height = (self.height + self.offset) * len(self.items)
-        height = min(self.max_height, total_height)
-        if total_height > self.max_height:
-            height -= 10 * (len(self.items)-self.max_items)
-        self.slider_rect = pygame.Rect(self.x + self.width + self.offset, self.y, 20, height)
+        count = len(self.items)
+        height = min(self.max_height, self.row_height * count)
+        y = self.y
+        if count > self.max_items:
+            # the thumb shrinks with the list but stays big enough to grab
+            height = max(20, self.max_height * self.max_items // count)
+            y += round((self.max_height - height) * self.scroll / self.get_max_scroll())
+        self.slider_rect = pygame.Rect(self.x + self.width + self.offset, y, 20, height)
 
     def update(self):
-        pixel_offset = self.dy / 10 * (self.height + self.offset)
-        self.get_item_rects(pixel_offset)
+        if self.scroll > self.get_max_scroll():
+            self.scroll = self.get_max_scroll()
+        self.update_slider()
+        self.get_item_rects()
+
+    def get_bounds(self):
+        bounds = self.top_rect.union(self.bottom_rect)
+        bounds.union_ip(self.slider_rect.x, self.y, self.slider_rect.width, self.max_height)
+        return bounds
+
+    def get_state(self):
+        return (self.scroll, self.active_colour, self.current_colour, self.scene_colour, self.items, len(self.items), tuple(self.slider_rect))
+
+    def get_index_at(self, pos):
+        if not self.x <= pos[0] < self.x + self.width:
+            return None
+        row = (pos[1] - self.y) / self.row_height + self.scroll
+        index = int(row // 1)
+        # inside the gap between rows
+        if row - index >= self.height / self.row_height:
+            return None
+        for i, _, rect in self.item_rects:
+            if i == index:
+                return index
+        return None
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.active_colour, self.slider_rect, 0, 25)
-        for item, rect, on_screen in self.item_rects:
-            if rect.y + self.height < self.y + self.max_height + self.offset and rect.y + self.height > self.y:
-                self.item_rects[self.item_rects.index((item, rect, on_screen))] = (item, rect, True)
-                pygame.draw.rect(screen, self.current_colour, rect, 0, 25)
-                txt_surface = self.font.render(item, True, self.text_colour)
-                screen.blit(txt_surface, (rect.x + 20, rect.y + (rect.height - txt_surface.get_height()) // 2))
+        for _, item, rect in self.item_rects:
+            pygame.draw.rect(screen, self.current_colour, rect, 0, 25)
+            txt_surface = render_text(self.font, item, self.text_colour)
+            screen.blit(txt_surface, (rect.x + 20, rect.y + (rect.height - txt_surface.get_height()) // 2))
 
         pygame.draw.rect(screen, self.scene_colour, self.top_rect)
         pygame.draw.rect(screen, self.scene_colour, self.bottom_rect)
 
-    def get_item_rects(self, dy=0):
+    def get_item_rects(self):
+        # only the rows inside the viewport get a rect, however long the list is
         self.item_rects = []
-        for i, item in enumerate(self.items):
-            rect = pygame.Rect(self.x, self.y + (self.height + self.offset) * i + dy, self.width, self.height)
-            self.item_rects.append((item, rect, False))
+        first = max(0, int(self.scroll) - 1)
+        last = min(len(self.items), int(self.scroll) + self.max_items + 2)
+        for i in range(first, last):
+            rect = pygame.Rect(self.x, self.y + round((i - self.scroll) * self.row_height), self.width, self.height)
+            if rect.y + self.height < self.y + self.max_height + self.offset and rect.y + self.height > self.y:
+                self.item_rects.append((i, self.items[i], rect))
+
+SONG_COLUMNS = [("name", 0), ("artist", 225), ("genre", 450), ("length", 675)]
+
+class Table(ItemList):
+    # rows are the records themselves, so selected hands back the original record
+    def __init__(self, x, y, width, height, items, columns=SONG_COLUMNS, max_items=4, offset=20):
+        super().__init__(x, y, width, height, items, max_items, offset)
+        self.set_columns(columns)
+
+    def set_columns(self, columns):
+        self.columns = []
+        for i, (key, x) in enumerate(columns):
+            end = columns[i+1][1] if i + 1 < len(columns) else self.width
+            self.columns.append((key, x, end - x - 20))
+
+    def get_state(self):
+        return super().get_state() + (tuple(self.columns),)
+
+    def draw(self, screen):
+        pygame.draw.rect(screen, self.active_colour, self.slider_rect, 0, 25)
+        for _, item, rect in self.item_rects:
+            pygame.draw.rect(screen, self.current_colour, rect, 0, 25)
+            for key, x, width in self.columns:
+                # cell surfaces come out of the shared text cache
+                txt_surface = render_text(self.font, str(getattr(item, key)), self.text_colour)
+                area = pygame.Rect(0, 0, min(width, txt_surface.get_width()), txt_surface.get_height())
+                screen.blit(txt_surface, (rect.x + x + 20, rect.y + (rect.height - txt_surface.get_height()) // 2), area)
+
+        pygame.draw.rect(screen, self.scene_colour, self.top_rect)
+        pygame.draw.rect(screen, self.scene_colour, self.bottom_rect)
 
 class Checkboxes(UIElement):
     def __init__(self, x, y, width, height, items, background=True):
@@ -313,7 +657,7 @@ class Checkboxes(UIElement):
         self.items = items
         self.items = list(zip(self.items, [False] * len(self.items)))
         self.font = BUTTON_FONT
-        self.tick = pygame.image.load(ASSETS["TICK"])
+        self.tick = asset_manager.load(ASSETS["TICK"])
         self.checkbox_colour = COLOURS["LIGHT_BLUE"]
         self.text_colour = COLOURS["BLACK"]
         self.selected = []
@@ -322,21 +666,37 @@ class Checkboxes(UIElement):
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
-            for item, _, checkbox_rect in self.checkbox_rects:
-                if checkbox_rect.collidepoint(event.pos):
-                    new_item = (item[0], not item[1])
-                    self.items[self.items.index(item)] = new_item
+            index = self.get_index_at(event.pos)
+            if index is not None:
+                item = self.items[index]
+                self.items[index] = (item[0], not item[1])
+
+    def get_index_at(self, pos):
+        # one row per item, only the box itself toggles
+        index = (pos[1] - self.y) // self.height
+        if not 0 <= index < len(self.checkbox_rects):
+            return None
+        return index if self.checkbox_rects[index][2].collidepoint(pos) else None
 
     def update(self):
         super().update()
         self.get_checkbox_rects()
 
+    def get_bounds(self):
+        bounds = pygame.Rect(self.x, self.y, self.width, self.height * len(self.items))
+        # the boxes sit past the labels' width
+        for _, _, checkbox_rect in self.checkbox_rects:
+            bounds.union_ip(checkbox_rect)
+        return bounds
+
+    def get_state(self):
+        return (tuple(self.rect), tuple(self.items), self.bg_colour, self.text_colour)
+
     def draw(self, screen):
         for item, rect, checkbox_rect in self.checkbox_rects:
             if self.background:
                 pygame.draw.rect(screen, self.bg_colour, rect, 0, 25)
-            txt_surface = self.font.render(item[0], True, self.text_colour)
-            checkbox_rect.y = rect.y + (rect.height - txt_surface.get_height()) // 2
+            txt_surface = render_text(self.font, item[0], self.text_colour)
             pygame.draw.rect(screen, self.checkbox_colour, checkbox_rect, 0, 5)
             if item[1]:
                 screen.blit(self.tick, (checkbox_rect.x, checkbox_rect.y))
@@ -346,18 +706,20 @@ class Checkboxes(UIElement):
         self.checkbox_rects = []
         for i, item in enumerate(self.items):
             rect = pygame.Rect(self.x, self.y + self.height * i, self.width, self.height)
-            checkbox_rect = pygame.Rect(self.x + 200, rect.y, 32, 32)
+            checkbox_rect = pygame.Rect(self.x + 200, rect.y + (rect.height - FONTS.height(self.font)) // 2, 32, 32)
             self.checkbox_rects.append((item, rect, checkbox_rect))
 
 class Playlist():
-    def __init__(self, info={}):
+    def __init__(self, info={}, size=(350, 250)):
         self.info = info
         self.old_info = info
-        self.rect = None
+        self.rect = pygame.Rect((0, 0), size)
         self.colour = COLOURS["LIGHT_BLUE"]
         self.text_colour = COLOURS["BLACK"]
         self.font = BUTTON_FONT
         self.active = False
+        self.card = None
+        self.card_key = None
         self._process_info()
 
     def handle_event(self, event):
@@ -369,10 +731,7 @@ class Playlist():
         for v in self.info.values():
             for k, val in v.items():
                 if k == "img":
-                    try:
-                        self.image = pygame.image.load(val)
-                    except:
-                        self.image = pygame.image.load(ASSETS["BASE_PLAYLIST_IMG"])
+                    self.cover = covers.request(val)
                 elif k == "songs":
                     self.info = {
                         "Name": list(self.info.keys())[0],
@@ -381,40 +740,51 @@ class Playlist():
                     }
 
     def _get_song_duration(self, songs):
-        total_minutes = sum(int(song['length'].split(":")[0]) for song in songs)
-        total_seconds = sum(int(song['length'].split(":")[1]) for song in songs)
-        total = total_minutes + total_seconds / 60
-        return str(round(total))
+        return str(round(sum(song.seconds for song in songs) / 60))
 
     def update_rect(self, rect):
         self.rect = rect
     
     def update_image(self, img):
-        self.image = pygame.image.load(img)
-
-    def get_text(self):
-        self.txt = "\n".join([f"{k}: {v}" for k, v in self.info.items()])
-        lines = self.txt.split('\n')
-        self.text_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        y_offset = self.rect.height - len(lines) * self.font.get_height() - 5
-        for line in lines:
-            line_surface = self.font.render(line, True, self.text_colour)
-            self.text_surface.blit(line_surface, (0, y_offset))
-            y_offset += line_surface.get_height()
+        self.cover = covers.request(img)
+
+    @property
+    def image(self):
+        # the default cover stands in until the real one has been decoded
+        return covers.get(self.cover) or asset_manager.load(ASSETS["BASE_PLAYLIST_IMG"])
+
+    def get_card(self):
+        # background, info and cover in one surface, only redone when one of them changes
+        image = self.image
+        key = (tuple(self.info.items()), image, self.rect.size, self.colour, self.text_colour)
+        if key != self.card_key:
+            self.card = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(self.card, self.colour, self.card.get_rect(), 0, 25)
+            lines = [f"{k}: {v}" for k, v in self.info.items()]
+            y_offset = self.rect.height - len(lines) * FONTS.height(self.font) - 5
+            for line in lines:
+                line_surface = render_text(self.font, line, self.text_colour)
+                self.card.blit(line_surface, (20, y_offset))
+                y_offset += line_surface.get_height()
+            self.card.blit(image, (20, 20))
+            self.card_key = key
+        return self.card
 
     def draw(self, screen):
-        pygame.draw.rect(screen, COLOURS["LIGHT_BLUE"], self.rect, 0, 25)
-        screen.blit(self.text_surface, (self.rect.x + 20, self.rect.y + (self.rect.height - self.text_surface.get_height()) // 2))
-        screen.blit(self.image, (self.rect.x+20, self.rect.y+20))
+        screen.blit(self.get_card(), self.rect)
 
     def __len__(self):
         return len(self.info)
 
 class PlaylistSlide(ItemList):
+    # items are the playlists' info, cards are only built for the rows around the viewport
     def __init__(self, x, y, width, height, max_len=3, max_height=3, items=[]):
         self.max_len = max_len
+        self.dy = 0
+        self.cards = {}
+        self.card_items = None
         super().__init__(x, y, width, height, items, max_items=max_height)
-        if not all(type(item) == Playlist for item in items):
+        if not all(type(item) == dict for item in items):
             raise Exception
         
         self.max_height = (self.height+self.offset) * self.max_items
@@ -425,11 +795,11 @@ class PlaylistSlide(ItemList):
         self.update_slider()
 
     def handle_event(self, event):
-        for item in self.items:
-            item.handle_event(event)
+        for card in self.cards.values():
+            card.handle_event(event)
 
-        mouse_pos = pygame.mouse.get_pos()
-        buttons = pygame.mouse.get_pressed()
+        mouse_pos = INPUT.pos
+        buttons = INPUT.buttons
         if buttons[0]:
             if self.slider_rect.collidepoint(mouse_pos):
                 self.active = True
@@ -440,9 +810,9 @@ class PlaylistSlide(ItemList):
             self.active_colour = self.slider_colour
         
         if event.type == pygame.MOUSEBUTTONDOWN:
-            for item in self.items:
-                if item.rect.collidepoint(event.pos):
-                    self.selected = item
+            for card in self.get_visible_cards():
+                if card.rect.collidepoint(event.pos):
+                    self.selected = card
             if self.slider_rect.collidepoint(event.pos):
                 self.old_y = mouse_pos[1]
         
@@ -454,17 +824,22 @@ class PlaylistSlide(ItemList):
                 self.old_y = mouse_pos[1]
 
     def update(self):
-        super().update()
         pixel_offset = self.dy / 10 * (self.height + self.offset)
         self.get_item_rects(pixel_offset)
-        for item in self.items:
-            item.get_text()
+
+    def get_bounds(self):
+        bounds = super().get_bounds()
+        # cards are only culled once their top passes the bottom cover
+        bounds.height += 2 * self.offset
+        return bounds
+
+    def get_state(self):
+        return (self.dy, self.active_colour, self.items, len(self.items), tuple(self.slider_rect), tuple((tuple(card.rect), card.image, tuple(card.info.items())) for card in self.get_visible_cards()))
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.active_colour, self.slider_rect, 0, 25)
-        for item in self.items:
-            if item.rect.y < self.y + self.max_height + self.offset and item.rect.y + self.height > self.y:
-                item.draw(screen)
+        for card in self.get_visible_cards():
+            card.draw(screen)
 
         pygame.draw.rect(screen, self.scene_colour, self.top_rect)
         pygame.draw.rect(screen, self.scene_colour, self.bottom_rect)
@@ -477,26 +852,44 @@ class PlaylistSlide(ItemList):
             height -= 10 * (math.ceil(len(self.items)/self.max_len)-self.max_items)
         self.slider_rect = pygame.Rect(self.x + x_offset, self.y, 20, height)
 
+    def get_card(self, index):
+        card = self.cards.get(index)
+        if card is None:
+            card = self.cards[index] = Playlist(self.items[index], (self.width, self.height))
+        return card
+
+    def get_visible_cards(self):
+        return [card for card in self.cards.values() if card.rect.y < self.y + self.max_height + self.offset and card.rect.y + self.height > self.y]
+
     def get_item_rects(self, dy=0):
-        x_offset = 0
-        y_offset = 0
-        for item in self.items:
-            rect = pygame.Rect(self.x + (self.width + self.offset) * x_offset, (self.y + ((self.height + self.offset) * y_offset)) + dy, self.width, self.height)
-            item.update_rect(rect)
-            if x_offset == self.max_len - 1:
-                x_offset = 0
-                y_offset += 1
-            else:
-                x_offset += 1
+        if self.items is not self.card_items:
+            self.cards = {}
+            self.card_items = self.items
+        row_height = self.height + self.offset
+        # one spare row either side so cards exist before they scroll in
+        first = max(0, int(-dy // row_height) - 1)
+        last = min(math.ceil(len(self.items) / self.max_len), int((self.max_height - dy) // row_height) + 2)
+        visible = range(first * self.max_len, min(len(self.items), last * self.max_len))
+        for index in list(self.cards):
+            if index not in visible:
+                del self.cards[index]
+        for index in visible:
+            row, column = divmod(index, self.max_len)
+            rect = pygame.Rect(self.x + (self.width + self.offset) * column, self.y + row_height * row + dy, self.width, self.height)
+            self.get_card(index).update_rect(rect)
 
 class ArbitraryRect(UIElement):
     def __init__(self, x, y, width, height, colour=COLOURS["LIGHT_BLUE"], border_radius=5):
         super().__init__(x, y, width, height)
         self.border_radius = border_radius
         self.colour = colour
+        self.interactive = False
 
     def handle_event(self, event):
         pass
 
+    def get_state(self):
+        return (tuple(self.rect), self.colour)
+
     def draw(self, screen):
         pygame.draw.rect(screen, self.colour, self.rect, 0, self.border_radius)
\ No newline at end of file